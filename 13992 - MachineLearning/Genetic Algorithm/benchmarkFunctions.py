@@ -1,4 +1,5 @@
 import math
+import numpy as np
 class IBenchmarkFunction:
     @classmethod
     def getMinRangeOfVariables(cls):
@@ -15,6 +16,12 @@ class IBenchmarkFunction:
     @classmethod
     def calculate(cls, variables):
         pass
+    @classmethod
+    def calculateBatch(cls, variableMatrix):
+        # values of the rows of an N x D matrix of variables, functions
+        # only defining calculate are evaluated one row at a time
+        return np.array([cls.calculate(list(variables))
+                         for variables in variableMatrix], dtype = np.float64)
 class SphereFunction(IBenchmarkFunction):
     @classmethod
     def getMinRangeOfVariables(cls):
@@ -35,6 +42,10 @@ class SphereFunction(IBenchmarkFunction):
         for x in variables:
             result += x ** 2
         return result
+    @classmethod
+    def calculateBatch(cls, variableMatrix):
+        variableMatrix = np.asarray(variableMatrix, dtype = np.float64)
+        return (variableMatrix ** 2).sum(axis = 1)
 class BentCigarFunction(IBenchmarkFunction):
     @classmethod
     def getMinRangeOfVariables(cls):
@@ -55,6 +66,11 @@ class BentCigarFunction(IBenchmarkFunction):
         for i in range(1, len(variables)):
             result += (10 ** 6) * (variables[i] ** 2)
         return result
+    @classmethod
+    def calculateBatch(cls, variableMatrix):
+        variableMatrix = np.asarray(variableMatrix, dtype = np.float64)
+        return (variableMatrix[:, 0] ** 2
+                + (10 ** 6) * (variableMatrix[:, 1:] ** 2).sum(axis = 1))
 class RastriginsFunction(IBenchmarkFunction):
     @classmethod
     def getMinRangeOfVariables(cls):
@@ -75,6 +91,12 @@ class RastriginsFunction(IBenchmarkFunction):
         for x in variables:
             result += x ** 2 - 10 * math.cos(2 * math.pi * x)
         return result
+    @classmethod
+    def calculateBatch(cls, variableMatrix):
+        variableMatrix = np.asarray(variableMatrix, dtype = np.float64)
+        return (10 * variableMatrix.shape[1]
+                + (variableMatrix ** 2
+                   - 10 * np.cos(2 * math.pi * variableMatrix)).sum(axis = 1))
 class AckleysFunction(IBenchmarkFunction):
     @classmethod
     def getMinRangeOfVariables(cls):
@@ -103,5 +125,15 @@ class AckleysFunction(IBenchmarkFunction):
             + 20 + math.exp(1)
             )
         return result
-
-        
+    @classmethod
+    def calculateBatch(cls, variableMatrix):
+        variableMatrix = np.asarray(variableMatrix, dtype = np.float64)
+        variableCount = variableMatrix.shape[1]
+        sumX2 = (variableMatrix ** 2).sum(axis = 1)
+        sumCos2PiX = np.cos(2 * math.pi * variableMatrix).sum(axis = 1)
+        result = (
+            - 20 * np.exp(- 0.2 * np.sqrt(sumX2 / variableCount))
+            - np.exp(sumCos2PiX / variableCount)
+            + 20 + math.exp(1)
+            )
+        return result
@@ -0,0 +1,194 @@
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+from geneticAlgorithmSolver import GeneticAlgorithmSolver
+from workerPool import getProcessContext
+
+def _runCell(cell):
+    functionName, function, configName, configDigest, config, seed = cell
+    startTime = time.perf_counter()
+    solver = GeneticAlgorithmSolver(function = function,
+                                    randomGenerator = random.Random(seed),
+                                    **config)
+    finalError = solver.solve()
+    seconds = time.perf_counter() - startTime
+    return {"function": functionName,
+            "config": configName,
+            "configDigest": configDigest,
+            "seed": seed,
+            "finalError": finalError,
+            "optimumResult": solver.getOptimumResult(),
+            "seconds": seconds,
+            "generations": solver.getGenerationCount(),
+            "evaluations": solver.getEvaluationCount(),
+            "stopReason": solver.getStopReason(),
+            "populationErrorList": solver.getPopulationErrorList()}
+
+class ExperimentRunner:
+    # Runs GeneticAlgorithmSolver on every cell of a grid of functions,
+    # configs (name: solver options) and seeds on a process pool. Each
+    # cell has its own random.Random(seed), so a cell gives the same
+    # results on any worker and in any order, and cells with the same seed
+    # compare configs on the same random numbers. Finished cells are
+    # appended to storeFileName, a .csv file or JSON lines otherwise, and
+    # the cells already in it, with the same options of their config, are
+    # not run again. A process evaluator of a config calculates in the
+    # worker of its cell.
+    fieldNames = ["function", "config", "configDigest", "seed", "finalError",
+                  "optimumResult", "seconds", "generations", "evaluations",
+                  "stopReason", "populationErrorList"]
+    def __init__(self, functions, configs, seeds, storeFileName,
+                 workerCount = None):
+        # functions: IBenchmarkFunction classes defined at the top level of
+        # a module, workerCount: processes, None for one per CPU
+        if len(functions) == 0 or len(configs) == 0 or len(seeds) == 0:
+            raise Exception("functions, configs and seeds should not be empty")
+        if workerCount != None and workerCount <= 0:
+            raise Exception("workerCount should be > 0")
+        if workerCount == None:
+            workerCount = multiprocessing.cpu_count()
+        self.functions = list(functions)
+        self.configs = dict(configs)
+        self.seeds = [int(s) for s in seeds]
+        self.storeFileName = storeFileName
+        self.workerCount = int(workerCount)
+        self.isCsv = storeFileName.lower().endswith(".csv")
+    def getCells(self):
+        cells = []
+        for function in self.functions:
+            for configName in self.configs:
+                configDigest = self.getConfigDigest(self.configs[configName])
+                for seed in self.seeds:
+                    cells.append((function.__name__, function, configName,
+                                  configDigest, self.configs[configName], seed))
+        return cells
+    @classmethod
+    def getConfigDigest(cls, config):
+        # the same for the same solver options in every run, so that a
+        # config changed under the same name is run again
+        configJson = json.dumps(config, sort_keys = True,
+                                default = cls.describeOption)
+        return hashlib.sha1(configJson.encode("utf-8")).hexdigest()[:16]
+    @classmethod
+    def describeOption(cls, value):
+        # option values that are not JSON types: functions and classes by
+        # their names, other objects by their class and attributes. There
+        # is no repr fallback, a repr with a memory address would change
+        # the digest in every run.
+        if hasattr(value, "__qualname__"):
+            return value.__module__ + "." + value.__qualname__
+        if isinstance(value, (np.ndarray, np.generic)):
+            return value.tolist()
+        if isinstance(value, (set, frozenset)):
+            return sorted(value, key = repr)
+        if hasattr(value, "__dict__"):
+            return [type(value).__module__ + "." + type(value).__qualname__,
+                    vars(value)]
+        raise TypeError("a config option cannot be described for its digest: "
+                        + type(value).__name__)
+    @classmethod
+    def getCellKey(cls, record):
+        return (record["function"], record["config"], record.get("configDigest"),
+                int(record["seed"]))
+    def loadStore(self):
+        # records of the store, without a last line cut off by an
+        # interrupted run, which is also removed from the file
+        if not os.path.exists(self.storeFileName):
+            return []
+        with open(self.storeFileName, "rb+") as storeFile:
+            content = storeFile.read()
+            if len(content) > 0 and not content.endswith(b"\n"):
+                storeFile.truncate(content.rfind(b"\n") + 1)
+        records = []
+        with open(self.storeFileName, newline = "") as storeFile:
+            if self.isCsv:
+                reader = csv.DictReader(storeFile)
+                if (reader.fieldnames != None
+                    and reader.fieldnames != self.fieldNames):
+                    raise Exception("the columns of " + self.storeFileName
+                                    + " should be ExperimentRunner.fieldNames")
+                for row in reader:
+                    records.append(self.parseCsvRow(row))
+            else:
+                for line in storeFile:
+                    if line.strip() != "":
+                        records.append(json.loads(line))
+        return records
+    @classmethod
+    def parseCsvRow(cls, row):
+        return {"function": row["function"],
+                "config": row["config"],
+                "configDigest": row["configDigest"],
+                "seed": int(row["seed"]),
+                "finalError": float(row["finalError"]),
+                "optimumResult": float(row["optimumResult"]),
+                "seconds": float(row["seconds"]),
+                "generations": int(row["generations"]),
+                "evaluations": int(row["evaluations"]),
+                "stopReason": row["stopReason"],
+                "populationErrorList": json.loads(row["populationErrorList"])}
+    def run(self):
+        # returns the records of all cells of the grid
+        records = self.loadStore()
+        cellKeys = set()
+        for cell in self.getCells():
+            cellKeys.add((cell[0], cell[2], cell[3], cell[5]))
+        doneKeys = set()
+        for record in records:
+            doneKeys.add(self.getCellKey(record))
+        cells = [c for c in self.getCells()
+                 if (c[0], c[2], c[3], c[5]) not in doneKeys]
+        isNewStore = (not os.path.exists(self.storeFileName)
+                      or os.path.getsize(self.storeFileName) == 0)
+        with open(self.storeFileName, "a", newline = "") as storeFile:
+            if self.isCsv:
+                writer = csv.DictWriter(storeFile, fieldnames = self.fieldNames)
+                if isNewStore:
+                    writer.writeheader()
+            def store(record):
+                if self.isCsv:
+                    row = dict(record)
+                    row["populationErrorList"] = json.dumps(
+                        record["populationErrorList"])
+                    writer.writerow(row)
+                else:
+                    storeFile.write(json.dumps(record) + "\n")
+                storeFile.flush()
+                records.append(record)
+            if self.workerCount == 1 or len(cells) <= 1:
+                for cell in cells:
+                    store(_runCell(cell))
+            else:
+                poolSize = min(self.workerCount, len(cells))
+                with getProcessContext().Pool(poolSize) as pool:
+                    for record in pool.imap_unordered(_runCell, cells):
+                        store(record)
+        return [r for r in records if self.getCellKey(r) in cellKeys]
+    @classmethod
+    def summarize(cls, records):
+        # {(function, config): {"runs", "meanError", "minError",
+        # "maxError", "meanSeconds", "meanEvaluations"}}
+        errorLists = {}
+        secondLists = {}
+        evaluationLists = {}
+        for record in records:
+            key = (record["function"], record["config"])
+            errorLists.setdefault(key, []).append(record["finalError"])
+            secondLists.setdefault(key, []).append(record["seconds"])
+            evaluationLists.setdefault(key, []).append(record["evaluations"])
+        summary = {}
+        for key in errorLists:
+            errorList = errorLists[key]
+            summary[key] = {"runs": len(errorList),
+                            "meanError": sum(errorList) / len(errorList),
+                            "minError": min(errorList),
+                            "maxError": max(errorList),
+                            "meanSeconds": sum(secondLists[key]) / len(errorList),
+                            "meanEvaluations": (sum(evaluationLists[key])
+                                                / len(errorList))}
+        return summary
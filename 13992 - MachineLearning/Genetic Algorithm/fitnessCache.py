@@ -0,0 +1,34 @@
+from collections import OrderedDict
+class FitnessCache:
+    # Objective values of up to maxSize genotypes, the least recently used
+    # one is evicted first
+    def __init__(self, maxSize):
+        if maxSize <= 0:
+            raise Exception("maxSize should be > 0")
+        self.maxSize = int(maxSize)
+        self.values = OrderedDict()
+        self.hitCount = 0
+        self.missCount = 0
+        self.evictionCount = 0
+    def get(self, key):
+        # returns None when key is not cached
+        value = self.values.get(key)
+        if value == None:
+            self.missCount += 1
+            return None
+        self.values.move_to_end(key)
+        self.hitCount += 1
+        return value
+    def put(self, key, value):
+        self.values[key] = value
+        self.values.move_to_end(key)
+        if len(self.values) > self.maxSize:
+            self.values.popitem(last = False)
+            self.evictionCount += 1
+    def getStats(self):
+        lookupCount = self.hitCount + self.missCount
+        return {"hits": self.hitCount,
+                "misses": self.missCount,
+                "evictions": self.evictionCount,
+                "size": len(self.values),
+                "hitRate": self.hitCount / lookupCount if lookupCount > 0 else 0.0}
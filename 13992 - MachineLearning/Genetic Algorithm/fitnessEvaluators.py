@@ -0,0 +1,117 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import numpy as np
+from workerPool import getProcessContext
+
+def _calculateChunk(function, variableMatrix):
+    # one call for the whole chunk when the function has a batch path,
+    # IBenchmarkFunction.calculateBatch
+    if hasattr(function, "calculateBatch"):
+        return [float(v) for v in function.calculateBatch(variableMatrix)]
+    valueList = []
+    for variableList in variableMatrix:
+        valueList.append(function.calculate(list(variableList)))
+    return valueList
+
+class IFitnessEvaluator:
+    # Calculates the objective values of the rows of a variable matrix for
+    # GeneticAlgorithmSolver, in the order of the rows
+    def evaluate(self, function, variableMatrix):
+        pass
+    def close(self):
+        pass
+    def __enter__(self):
+        return self
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
+
+class SerialFitnessEvaluator(IFitnessEvaluator):
+    def evaluate(self, function, variableMatrix):
+        return _calculateChunk(function, variableMatrix)
+
+class PoolFitnessEvaluator(IFitnessEvaluator):
+    # Sends the rows in chunks of chunkSize to a pool of workerCount
+    # workers, started on the first evaluate, and collects the values in
+    # the order of the chunks. chunkSize None splits the rows into about
+    # 4 chunks per worker. A single row is calculated in the caller.
+    def __init__(self, workerCount = None, chunkSize = None):
+        if workerCount != None and workerCount <= 0:
+            raise Exception("workerCount should be > 0")
+        if chunkSize != None and chunkSize <= 0:
+            raise Exception("chunkSize should be > 0")
+        if workerCount == None:
+            workerCount = multiprocessing.cpu_count()
+        self.workerCount = int(workerCount)
+        self.chunkSize = chunkSize
+        self.executor = None
+    def createExecutor(self):
+        pass
+    def getChunks(self, variableMatrix):
+        if self.chunkSize == None:
+            chunkSize = max(1, -(-len(variableMatrix) // (4 * self.workerCount)))
+        else:
+            chunkSize = self.chunkSize
+        return [variableMatrix[c : c + chunkSize]
+                for c in range(0, len(variableMatrix), chunkSize)]
+    def evaluate(self, function, variableMatrix):
+        variableMatrix = np.asarray(variableMatrix, dtype = np.float64)
+        if len(variableMatrix) <= 1:
+            return _calculateChunk(function, variableMatrix)
+        if self.executor == None:
+            self.executor = self.createExecutor()
+        chunks = self.getChunks(variableMatrix)
+        valueList = []
+        for chunkValues in self.executor.map(_calculateChunk,
+                                             [function] * len(chunks), chunks):
+            valueList.extend(chunkValues)
+        return valueList
+    def close(self):
+        if self.executor != None:
+            self.executor.shutdown()
+            self.executor = None
+
+class ThreadPoolFitnessEvaluator(PoolFitnessEvaluator):
+    # for objectives that release the GIL, for example in NumPy or while
+    # waiting for I/O
+    def createExecutor(self):
+        return concurrent.futures.ThreadPoolExecutor(self.workerCount)
+
+class ProcessPoolFitnessEvaluator(PoolFitnessEvaluator):
+    # for CPU bound objectives, the function is pickled with each chunk,
+    # so it should be defined at the top level of a module
+    def evaluate(self, function, variableMatrix):
+        # a pool worker, like a cell of ExperimentRunner, cannot have a
+        # pool, it calculates the rows itself
+        if multiprocessing.current_process().daemon:
+            return _calculateChunk(function,
+                                   np.asarray(variableMatrix, dtype = np.float64))
+        return PoolFitnessEvaluator.evaluate(self, function, variableMatrix)
+    def createExecutor(self):
+        return concurrent.futures.ProcessPoolExecutor(
+            self.workerCount, mp_context = getProcessContext())
+
+class AsyncioFitnessEvaluator(IFitnessEvaluator):
+    # For I/O bound objectives. Runs up to concurrencyCount calls of the
+    # coroutine function.calculateAsync(variables) at a time, or of the
+    # serial calculation of single rows in threads when the function has
+    # no calculateAsync.
+    def __init__(self, concurrencyCount = 32):
+        if concurrencyCount <= 0:
+            raise Exception("concurrencyCount should be > 0")
+        self.concurrencyCount = int(concurrencyCount)
+    def evaluate(self, function, variableMatrix):
+        variableMatrix = np.asarray(variableMatrix, dtype = np.float64)
+        async def calculateAll():
+            semaphore = asyncio.Semaphore(self.concurrencyCount)
+            async def calculate(r):
+                async with semaphore:
+                    if hasattr(function, "calculateAsync"):
+                        return await function.calculateAsync(
+                            variableMatrix[r].tolist())
+                    valueList = await asyncio.get_running_loop().run_in_executor(
+                        None, _calculateChunk, function, variableMatrix[r : r + 1])
+                    return valueList[0]
+            return await asyncio.gather(
+                *[calculate(r) for r in range(len(variableMatrix))])
+        return list(asyncio.run(calculateAll()))
@@ -1,5 +1,45 @@
+import os
+import pickle
 import random
+import struct
+import time
+import zlib
+import numpy as np
+from populationEngines import StringPopulationEngine
+from populationEngines import BitMatrixPopulationEngine
+from populationEngines import RealPopulationEngine
+from fitnessCache import FitnessCache
+from fitnessEvaluators import IFitnessEvaluator
+from fitnessEvaluators import SerialFitnessEvaluator
+from fitnessEvaluators import ThreadPoolFitnessEvaluator
+from fitnessEvaluators import ProcessPoolFitnessEvaluator
+from fitnessEvaluators import AsyncioFitnessEvaluator
+from selectionMethods import ISelectionMethod
+from selectionMethods import RouletteWheelSelection
+from selectionMethods import StochasticUniversalSampling
+from selectionMethods import TournamentSelection
 class GeneticAlgorithmSolver:
+    # engine: "string" for chromosomes as strings of '0' and '1' changed
+    # one pair at a time, "numpy" for the whole population as one bit
+    # matrix changed by vectorized operators, "real" for a matrix of the
+    # variables themselves, with the options of RealPopulationEngine in
+    # engineOptions
+    engineClasses = {"string": StringPopulationEngine,
+                     "numpy": BitMatrixPopulationEngine,
+                     "real": RealPopulationEngine}
+    # evaluator: one of these names, for an evaluator with default options
+    # closed after each solve, or an IFitnessEvaluator
+    evaluatorClasses = {"serial": SerialFitnessEvaluator,
+                        "thread": ThreadPoolFitnessEvaluator,
+                        "process": ProcessPoolFitnessEvaluator,
+                        "asyncio": AsyncioFitnessEvaluator}
+    # selection: one of these names, for a method with default options,
+    # or an ISelectionMethod
+    selectionClasses = {"roulette": RouletteWheelSelection,
+                        "sus": StochasticUniversalSampling,
+                        "tournament": TournamentSelection}
+    checkpointMagic = b"GACP"
+    checkpointVersion = 1
     def __init__(self,
                  function,
                  variableCount,
@@ -12,7 +52,21 @@ class GeneticAlgorithmSolver:
                  compareAfterCrossOver = False,
                  compareAfterMutation = False,
                  compareCandidatePopulations = False,
-                 candidatePopulationCount = 5
+                 candidatePopulationCount = 5,
+                 engine = "string",
+                 engineOptions = None,
+                 cacheSize = 10000,
+                 evaluator = "serial",
+                 randomGenerator = None,
+                 selection = "roulette",
+                 targetError = None,
+                 stagnationCount = None,
+                 minimumDiversity = None,
+                 timeLimit = None,
+                 maxEvaluations = None,
+                 callback = None,
+                 checkpointFileName = None,
+                 checkpointInterval = 10
                  ):
         if variableCount <= 0:
             raise Exception("variableCount should be > 0")
@@ -30,6 +84,31 @@ class GeneticAlgorithmSolver:
             raise Exception("geneMutationProbability should be between 0 and 1")
         if candidatePopulationCount <= 0:
             raise Exception("candidatePopulationCount should be > 0")
+        if engine not in self.engineClasses:
+            raise Exception("engine should be \"string\", \"numpy\" or \"real\"")
+        if (not isinstance(selection, ISelectionMethod)
+            and selection not in self.selectionClasses):
+            raise Exception("selection should be \"roulette\", \"sus\", "
+                            + "\"tournament\" or an ISelectionMethod")
+        if cacheSize < 0:
+            raise Exception("cacheSize should be >= 0")
+        if targetError != None and targetError < 0:
+            raise Exception("targetError should be >= 0")
+        if stagnationCount != None and stagnationCount <= 0:
+            raise Exception("stagnationCount should be > 0")
+        if (minimumDiversity != None
+            and (minimumDiversity < 0 or minimumDiversity > 1)):
+            raise Exception("minimumDiversity should be between 0 and 1")
+        if timeLimit != None and timeLimit <= 0:
+            raise Exception("timeLimit should be > 0")
+        if maxEvaluations != None and maxEvaluations <= 0:
+            raise Exception("maxEvaluations should be > 0")
+        if checkpointInterval <= 0:
+            raise Exception("checkpointInterval should be > 0")
+        if (not isinstance(evaluator, IFitnessEvaluator)
+            and evaluator not in self.evaluatorClasses):
+            raise Exception("evaluator should be \"serial\", \"thread\", "
+                            + "\"process\", \"asyncio\" or an IFitnessEvaluator")
         self.__function = function
         self.__variableCount = int(variableCount)
         self.__findMinimum = bool(findMinimum)
@@ -42,222 +121,374 @@ class GeneticAlgorithmSolver:
         self.__compareAfterMutation = bool(compareAfterMutation)
         self.__compareCandidatePopulations = bool(compareCandidatePopulations)
         self.__candidatePopulationCount = int(candidatePopulationCount)
+        self.__engine = engine
+        if engineOptions == None:
+            engineOptions = {}
+        self.__engineOptions = dict(engineOptions)
+        # objective values of up to cacheSize chromosomes are kept during
+        # a solve, 0 for none
+        self.__cacheSize = int(cacheSize)
+        self.__cacheStats = None
+        self.__evaluator = evaluator
+        if isinstance(selection, ISelectionMethod):
+            self.__selectionMethod = selection
+        else:
+            self.__selectionMethod = self.selectionClasses[selection]()
+        # a random.Random of this solver, None for the random module
+        if randomGenerator == None:
+            self.__randomGenerator = random
+        else:
+            self.__randomGenerator = randomGenerator
+        # stopping rules checked after each population, None for no rule:
+        # targetError: population error reached, stagnationCount:
+        # populations without a lower population error, minimumDiversity:
+        # engine.getDiversity of the population, timeLimit: seconds,
+        # maxEvaluations: objective values calculated, which the last
+        # population may exceed, callback(generationInfo): returns True to
+        # stop
+        self.__targetError = targetError
+        self.__stagnationCount = stagnationCount
+        self.__minimumDiversity = minimumDiversity
+        self.__timeLimit = timeLimit
+        self.__maxEvaluations = maxEvaluations
+        self.__callback = callback
+        # the solver state is saved to checkpointFileName every
+        # checkpointInterval populations, None for no checkpoints
+        self.__checkpointFileName = checkpointFileName
+        self.__checkpointInterval = int(checkpointInterval)
         self.__solved = False
         self.__populationErrorList = []
         self.__optimumVariableList = []
         self.__optimumResult = 0.0
+        self.__stopReason = None
+        self.__evaluationCount = 0
+        self.__cache = None
+        self.__activeEngine = None
+        self.__activeEvaluator = None
+        self.__currentPopulation = None
+        self.__currentFitnessList = None
     def solve(self):
-        def convertChromosomeToVariableList(chromosome):
-            variableList = []
-            for v in range(0, self.__variableCount):
-                binaryVariable = chromosome[v * self.__binaryVariableLength :
-                                            (v + 1) * self.__binaryVariableLength]
-                variable = (int(binaryVariable, 2) *
-                            (self.__function.getMaxRangeOfVariables()
-                             - self.__function.getMinRangeOfVariables())
-                            / (2**self.__binaryVariableLength - 1)
-                            + self.__function.getMinRangeOfVariables())
-                variableList.append(variable)
-            return variableList
-        def calcualteValue(chromosome):
-            variableList = convertChromosomeToVariableList(chromosome)
-            value = self.__function.calculate(variableList)
-            return value
-        def generateFirstPopulation():
-            firstPopulation = []
-            for c in range(0, self.__chromosomeCount):
-                newChromosome = ''
-                for v in range(0, self.__variableCount):
-                    newRandom = random.randint(0,
-                                               2**self.__binaryVariableLength - 1)
-                    newBinaryVariable = format(newRandom, '0'
-                                  + str(self.__binaryVariableLength)
-                                  + 'b')
-                    newChromosome += newBinaryVariable
-                firstPopulation.append(newChromosome)
-            return firstPopulation
-        def calculateFitness(population):
-            valueList = []
-            for c in range(0, len(population)):
-                chromosome = population[c]
-                value = calcualteValue(chromosome)
-                valueList.append(value)
-            sumValue = sum(valueList)
-            fitnessList = []
-            if self.__findMinimum:
-                maxValue = max(valueList)
-                for c in range(0, len(population)):
-                    fitness = ((- valueList[c] + maxValue + 1)
-                               /(- sumValue + (maxValue + 1)
-                                 * len(population)))
-                    fitnessList.append(fitness)
-            else:
-                minVlaue = min(valueList)
-                for c in range(0, len(population)):
-                    fitness = ((valueList[c] - minValue + 1)
-                               /(sumValue + (- minValue + 1)
-                                 * len(population)))
-                    fitnessList.append(fitness)
-            return fitnessList
-        def selectRandomChromosome(population, fitnessList):
-            newRandom = random.uniform(0,1)
-            boundry = 0
-            for c in range(0, len(population)):
-                chromosome = population[c]
-                boundry += fitnessList[c]
-                if boundry > newRandom:
-                    return chromosome
-        def selectBestChromosome(population, fitnessList):
-            maxFitness = max(fitnessList)
-            indexOfMaxFitness = fitnessList.index(maxFitness)
-            return population[indexOfMaxFitness]
-        def crossOver(parentChromosome1, parentChromosome2):
-            newRandom = random.uniform(0,1)
-            if self.__crossOverProbability > newRandom:
-                onePoint = random.randint(1,
-                                          (self.__binaryVariableLength
-                                           * self.__variableCount -1))
-                childChromosome1 = (parentChromosome1[:onePoint]
-                                    + parentChromosome2[onePoint:])
-                childChromosome2 = (parentChromosome2[:onePoint]
-                                    + parentChromosome1[onePoint:])
-            else:
-                childChromosome1 = parentChromosome1
-                childChromosome2 = parentChromosome2
-            return childChromosome1, childChromosome2
-        def crossOverAndCompare(parentChromosome1, parentChromosome2):
-            childChromosome1, childChromosome2 = (
-                crossOver(parentChromosome1, parentChromosome2)
-                )
-            if self.__findMinimum:
-                if (calcualteValue(parentChromosome1)
-                    < calcualteValue(childChromosome1)):
-                    childChromosome1 = parentChromosome1
-                if (calcualteValue(parentChromosome2)
-                    < calcualteValue(childChromosome2)):
-                    childChromosome2 = parentChromosome2
-            else:
-                if (calcualteValue(parentChromosome1)
-                    > calcualteValue(childChromosome1)):
-                    childChromosome1 = parentChromosome1
-                if (calcualteValue(parentChromosome2)
-                    > calcualteValue(childChromosome2)):
-                    childChromosome2 = parentChromosome2
-            return childChromosome1, childChromosome2
-        def mutate(chromosome):
-            newChromosome = ''
-            for g in range(0, len(chromosome)):
-                newRandom = random.uniform(0,1)
-                if self.__geneMutationProbability > newRandom:
-                    newChromosome += str(1 - int(chromosome[g]))
-                else:
-                    newChromosome += chromosome[g]
-            return newChromosome
-        def mutateAndCompare(chromosome):
-            newChromosome = mutate(chromosome)
-            if self.__findMinimum:
-                if (calcualteValue(newChromosome)
-                    < calcualteValue(chromosome)):
-                    return newChromosome
-                else:
-                    return chromosome
-            else:
-                if (calcualteValue(newChromosome)
-                    > calcualteValue(chromosome)):
-                    return newChromosome
-                else:
-                    return chromosome
-        def getChromosomeError(chromosome):
-            value = calcualteValue(chromosome)
-            if self.__findMinimum:
-                return (value
-                        - self.__function.getGlobalMinimum()
-                        ) ** 2
-            else:
-                return (value
-                        - self.__function.getGlobalMaximum()
-                        ) ** 2
-        def getPopulationError(population, fitnessList):
-            bestChromosome = selectBestChromosome(population, fitnessList)
-            return getChromosomeError(bestChromosome)
-        def findOptimum():
-            self.__solved = False
-            self.__populationErrorList = []
-            self.__optimumVariableList = []
-            self.__optimumResult = []
-            currentPopulation = generateFirstPopulation()
-            currentFitnessList = calculateFitness(currentPopulation)
-            self.__populationErrorList.append(
-                getPopulationError(currentPopulation, currentFitnessList))
-            for p in range(1, self.__populationCount):
-                if not self.__compareCandidatePopulations:
-                    self.__candidatePopulationCount = 1
+        self.start()
+        try:
+            self.evolve()
+        finally:
+            self.finish()
+        return self.getFinalError()
+    # A solve can also be run in steps: start, evolve for some populations
+    # at a time, for example to exchange chromosomes with immigrate and
+    # getBestChromosomes in between, and finish.
+    def start(self):
+        # makes and evaluates the first population
+        self.__solved = False
+        self.__populationErrorList = []
+        self.__optimumVariableList = []
+        self.__optimumResult = []
+        self.__stopReason = None
+        self.__evaluationCount = 0
+        self.__startTime = time.perf_counter()
+        self.__bestError = None
+        self.__stagnantPopulationCount = 0
+        if self.__cacheSize > 0:
+            self.__cache = FitnessCache(self.__cacheSize)
+        else:
+            self.__cache = None
+        self.__createEvaluatorAndEngine()
+        self.__currentPopulation = self.__activeEngine.generateFirstPopulation()
+        self.__currentFitnessList = self.__calculateFitness(
+            self.__currentPopulation)
+        self.__populationErrorList.append(self.__getPopulationError(
+            self.__currentPopulation, self.__currentFitnessList))
+        self.__stopReason = self.__getStopReason()
+    def __createEvaluatorAndEngine(self):
+        if isinstance(self.__evaluator, IFitnessEvaluator):
+            self.__activeEvaluator = self.__evaluator
+        else:
+            self.__activeEvaluator = self.evaluatorClasses[self.__evaluator]()
+        self.__activeEngine = self.engineClasses[self.__engine](
+            function = self.__function,
+            variableCount = self.__variableCount,
+            findMinimum = self.__findMinimum,
+            binaryVariableLength = self.__binaryVariableLength,
+            chromosomeCount = self.__chromosomeCount,
+            crossOverProbability = self.__crossOverProbability,
+            geneMutationProbability = self.__geneMutationProbability,
+            compareAfterCrossOver = self.__compareAfterCrossOver,
+            compareAfterMutation = self.__compareAfterMutation,
+            calculateValue = self.__calculateValue,
+            calculateValues = self.__calculateValues,
+            randomGenerator = self.__randomGenerator,
+            selectionMethod = self.__selectionMethod,
+            **self.__engineOptions)
+    def evolve(self, generationCount = None):
+        # makes up to generationCount more populations, None for all of
+        # them, and returns the stop reason, None when not stopped yet
+        lastGeneration = self.__populationCount - 1
+        if generationCount != None:
+            lastGeneration = min(lastGeneration,
+                                 len(self.__populationErrorList) - 1
+                                 + generationCount)
+        while (self.__stopReason == None
+               and len(self.__populationErrorList) - 1 < lastGeneration):
+            self.__makeNextPopulation()
+            self.__populationErrorList.append(self.__getPopulationError(
+                self.__currentPopulation, self.__currentFitnessList))
+            self.__stopReason = self.__getStopReason()
+            if (self.__checkpointFileName != None
+                and (len(self.__populationErrorList) - 1)
+                % self.__checkpointInterval == 0):
+                self.saveCheckpoint(self.__checkpointFileName)
+        if (self.__stopReason == None
+            and len(self.__populationErrorList) == self.__populationCount):
+            self.__stopReason = "populationCount"
+        return self.__stopReason
+    def finish(self):
+        # takes the optimum from the current population
+        if self.__stopReason == None:
+            self.__stopReason = "finish"
+        engine = self.__activeEngine
+        optimumChromosome = engine.selectBestChromosome(
+            self.__currentPopulation, self.__currentFitnessList)
+        self.__optimumVariableList = (
+            engine.convertChromosomeToVariableList(optimumChromosome))
+        self.__optimumResult = (
+            self.__function.calculate(self.__optimumVariableList))
+        if self.__cache != None:
+            self.__cacheStats = self.__cache.getStats()
+        if not isinstance(self.__evaluator, IFitnessEvaluator):
+            self.__activeEvaluator.close()
+        self.__solved = True
+    def saveCheckpoint(self, fileName):
+        # Saves everything needed to continue the solve exactly as if it
+        # had not stopped: the options, the current population, the error
+        # history, the cache and the states of the random generators. The
+        # evaluator is saved by name, the callback is not saved.
+        if self.__activeEngine == None or self.__solved:
+            raise Exception("only a started, unfinished solve can be saved")
+        options = {"function": self.__function,
+                   "variableCount": self.__variableCount,
+                   "findMinimum": self.__findMinimum,
+                   "binaryVariableLength": self.__binaryVariableLength,
+                   "chromosomeCount": self.__chromosomeCount,
+                   "populationCount": self.__populationCount,
+                   "crossOverProbability": self.__crossOverProbability,
+                   "geneMutationProbability": self.__geneMutationProbability,
+                   "compareAfterCrossOver": self.__compareAfterCrossOver,
+                   "compareAfterMutation": self.__compareAfterMutation,
+                   "compareCandidatePopulations": self.__compareCandidatePopulations,
+                   "candidatePopulationCount": self.__candidatePopulationCount,
+                   "engine": self.__engine,
+                   "engineOptions": self.__engineOptions,
+                   "cacheSize": self.__cacheSize,
+                   "selection": self.__selectionMethod,
+                   "targetError": self.__targetError,
+                   "stagnationCount": self.__stagnationCount,
+                   "minimumDiversity": self.__minimumDiversity,
+                   "timeLimit": self.__timeLimit,
+                   "maxEvaluations": self.__maxEvaluations,
+                   "checkpointFileName": self.__checkpointFileName,
+                   "checkpointInterval": self.__checkpointInterval}
+        if not isinstance(self.__evaluator, IFitnessEvaluator):
+            options["evaluator"] = self.__evaluator
+        state = {"options": options,
+                 "usesRandomModule": self.__randomGenerator is random,
+                 "randomState": self.__randomGenerator.getstate(),
+                 "engineState": self.__activeEngine.getState(),
+                 "currentPopulation": self.__currentPopulation,
+                 "currentFitnessList": self.__currentFitnessList,
+                 "populationErrorList": self.__populationErrorList,
+                 "stopReason": self.__stopReason,
+                 "evaluationCount": self.__evaluationCount,
+                 "elapsedTime": time.perf_counter() - self.__startTime,
+                 "bestError": self.__bestError,
+                 "stagnantPopulationCount": self.__stagnantPopulationCount,
+                 "cache": self.__cache}
+        stateBytes = zlib.compress(
+            pickle.dumps(state, protocol = pickle.HIGHEST_PROTOCOL))
+        temporaryFileName = fileName + ".tmp"
+        with open(temporaryFileName, "wb") as outputFile:
+            outputFile.write(self.checkpointMagic)
+            outputFile.write(struct.pack("<I", self.checkpointVersion))
+            outputFile.write(stateBytes)
+        os.replace(temporaryFileName, fileName)
+    @classmethod
+    def loadCheckpoint(cls, fileName, evaluator = None, callback = None):
+        # returns the solver of the checkpoint, ready for evolve and finish.
+        # evaluator: None for the saved one, or "serial" if it was not
+        # saved. A solver on the random module sets its state.
+        with open(fileName, "rb") as inputFile:
+            fileBytes = inputFile.read()
+        if fileBytes[:4] != cls.checkpointMagic:
+            raise Exception("not a genetic algorithm checkpoint: " + fileName)
+        version = struct.unpack("<I", fileBytes[4:8])[0]
+        if version != cls.checkpointVersion:
+            raise Exception("unsupported checkpoint version: " + str(version))
+        state = pickle.loads(zlib.decompress(fileBytes[8:]))
+        options = state["options"]
+        if evaluator != None:
+            options["evaluator"] = evaluator
+        if state["usesRandomModule"]:
+            randomGenerator = None
+        else:
+            randomGenerator = random.Random()
+        solver = cls(randomGenerator = randomGenerator, callback = callback,
+                     **options)
+        solver.__createEvaluatorAndEngine()
+        # after the engine, which may draw its own seed
+        solver.__randomGenerator.setstate(state["randomState"])
+        solver.__activeEngine.setState(state["engineState"])
+        solver.__currentPopulation = state["currentPopulation"]
+        solver.__currentFitnessList = state["currentFitnessList"]
+        solver.__populationErrorList = state["populationErrorList"]
+        solver.__stopReason = state["stopReason"]
+        solver.__evaluationCount = state["evaluationCount"]
+        solver.__startTime = time.perf_counter() - state["elapsedTime"]
+        solver.__bestError = state["bestError"]
+        solver.__stagnantPopulationCount = state["stagnantPopulationCount"]
+        solver.__cache = state["cache"]
+        return solver
+    @classmethod
+    def resume(cls, fileName, evaluator = None, callback = None):
+        # continues the solve of a checkpoint to its end and returns the
+        # finished solver
+        solver = cls.loadCheckpoint(fileName, evaluator, callback)
+        try:
+            solver.evolve()
+        finally:
+            solver.finish()
+        return solver
+    def getBestChromosomes(self, count):
+        # the count fittest chromosomes of the current population
+        bestIndices = self.__getFittestIndices(count)
+        return [self.__currentPopulation[i] for i in bestIndices]
+    def immigrate(self, chromosomes):
+        # replaces the least fit chromosomes of the current population
+        if len(chromosomes) == 0:
+            return
+        chromosomes = chromosomes[:self.__chromosomeCount]
+        worstIndices = self.__getFittestIndices(self.__chromosomeCount)[
+            self.__chromosomeCount - len(chromosomes):]
+        self.__currentPopulation = self.__activeEngine.replaceChromosomes(
+            self.__currentPopulation, worstIndices, chromosomes)
+        self.__currentFitnessList = self.__calculateFitness(
+            self.__currentPopulation)
+    def __getFittestIndices(self, count):
+        return np.argsort(-np.asarray(self.__currentFitnessList),
+                          kind = "stable")[:count].tolist()
+    def __calculateValue(self, chromosome):
+        # the same path as populations, so that a chromosome has one value
+        # whether it is cached or not
+        return self.__calculateValues([chromosome])[0]
+    def __calculateValues(self, population):
+        cache = self.__cache
+        if cache == None:
+            return self.__calculateUncachedValues(population)
+        # only the first of the uncached chromosomes with the same key is
+        # calculated
+        engine = self.__activeEngine
+        keys = engine.getGenotypeKeys(population)
+        valueList = [cache.get(k) for k in keys]
+        missingIndices = {}
+        for c in range(0, len(keys)):
+            if valueList[c] == None and keys[c] not in missingIndices:
+                missingIndices[keys[c]] = c
+        if len(missingIndices) > 0:
+            missingIndexList = list(missingIndices.values())
+            missingValues = self.__calculateUncachedValues(
+                engine.takeChromosomes(population, missingIndexList))
+            for c, value in zip(missingIndexList, missingValues):
+                cache.put(keys[c], value)
+                missingIndices[keys[c]] = value
+            for c in range(0, len(keys)):
+                if valueList[c] == None:
+                    valueList[c] = missingIndices[keys[c]]
+        return valueList
+    def __calculateUncachedValues(self, population):
+        self.__evaluationCount += len(population)
+        return self.__activeEvaluator.evaluate(
+            self.__function, self.__activeEngine.decodePopulation(population))
+    def __calculateFitness(self, population):
+        return self.__activeEngine.calculateFitness(
+            self.__calculateValues(population))
+    def __getBestValue(self, population):
+        if self.__findMinimum:
+            return min(self.__calculateValues(population))
+        else:
+            return max(self.__calculateValues(population))
+    def __getChromosomeError(self, chromosome):
+        value = self.__calculateValue(chromosome)
+        if self.__findMinimum:
+            return (value
+                    - self.__function.getGlobalMinimum()
+                    ) ** 2
+        else:
+            return (value
+                    - self.__function.getGlobalMaximum()
+                    ) ** 2
+    def __getPopulationError(self, population, fitnessList):
+        bestChromosome = self.__activeEngine.selectBestChromosome(population,
+                                                                  fitnessList)
+        return self.__getChromosomeError(bestChromosome)
+    def __makeNextPopulation(self):
+        currentPopulation = self.__currentPopulation
+        if not self.__compareCandidatePopulations:
+            self.__candidatePopulationCount = 1
+        else:
+            currentBestValue = self.__getBestValue(currentPopulation)
+        newPopulation = currentPopulation
+        for cp in range(0, self.__candidatePopulationCount):
+            candidatePopulation = self.__activeEngine.makeCandidatePopulation(
+                currentPopulation, self.__currentFitnessList)
+            if self.__compareCandidatePopulations:
+                candidateBestValue = self.__getBestValue(candidatePopulation)
+                if self.__findMinimum:
+                    if candidateBestValue < currentBestValue:
+                        currentBestValue = candidateBestValue
+                        newPopulation = candidatePopulation
                 else:
-                    currentBestValue = calcualteValue(currentPopulation[0])
-                    for c in range(1, self.__chromosomeCount):
-                        tempValue = calcualteValue(currentPopulation[c])
-                        if self.__findMinimum:
-                            if tempValue < currentBestValue:
-                                currentBestValue = tempValue
-                        else:
-                            if tempValue > currentBestValue:
-                                currentBestValue = tempValue
-                newPopulation = currentPopulation
-                for cp in range(0, self.__candidatePopulationCount):
-                    candidatePopulation = []
-                    for c in range(0, int(self.__chromosomeCount / 2)):
-                        chromosome1 = selectRandomChromosome(currentPopulation,
-                                                             currentFitnessList)
-                        chromosome2 = selectRandomChromosome(currentPopulation,
-                                                             currentFitnessList)
-                        if self.__compareAfterCrossOver:
-                            child1, child2 = crossOverAndCompare(chromosome1,
-                                                                 chromosome2)
-                        else:
-                            child1, child2 = crossOver(chromosome1,
-                                                       chromosome2)
-                        if self.__compareAfterMutation:
-                            mutated1 = mutateAndCompare(child1)
-                            mutated2 = mutateAndCompare(child2)
-                        else:
-                            mutated1 = mutate(child1)
-                            mutated2 = mutate(child2)
-                        candidatePopulation.append(mutated1)
-                        candidatePopulation.append(mutated2)
-                    if self.__compareCandidatePopulations:
-                        candidateBestValue = calcualteValue(
-                            candidatePopulation[0])
-                        for c in range(1, self.__chromosomeCount):
-                            tempValue = calcualteValue(candidatePopulation[c])
-                            if self.__findMinimum:
-                                if tempValue < candidateBestValue:
-                                    candidateBestValue = tempValue
-                            else:
-                                if tempValue > candidateBestValue:
-                                    candidateBestValue = tempValue
-                        if self.__findMinimum:
-                            if candidateBestValue < currentBestValue:
-                                currentBestValue = candidateBestValue
-                                newPopulation = candidatePopulation
-                        else:
-                            if candidateBestValue > currentBestValue:
-                                currentBestValue = candidateBestValue
-                                newPopulation = candidatePopulation
-                    else:
+                    if candidateBestValue > currentBestValue:
+                        currentBestValue = candidateBestValue
                         newPopulation = candidatePopulation
-                currentPopulation = newPopulation
-                currentFitnessList = calculateFitness(currentPopulation)
-                self.__populationErrorList.append(
-                    getPopulationError(currentPopulation, currentFitnessList))
-                self.__solved = True
-                optimumChromosome = selectBestChromosome(currentPopulation,
-                                                         currentFitnessList)
-                self.__optimumVariableList = (
-                    convertChromosomeToVariableList(optimumChromosome))
-                self.__optimumResult = (
-                    self.__function.calculate(self.__optimumVariableList))
-            return self.getFinalError()
-        return findOptimum()
+            else:
+                newPopulation = candidatePopulation
+        self.__currentPopulation = newPopulation
+        self.__currentFitnessList = self.__calculateFitness(newPopulation)
+    def __getStopReason(self):
+        # the first stopping rule met by the current population, None if
+        # none is
+        populationError = self.__populationErrorList[-1]
+        if self.__bestError == None or populationError < self.__bestError:
+            self.__bestError = populationError
+            self.__stagnantPopulationCount = 0
+        else:
+            self.__stagnantPopulationCount += 1
+        elapsedTime = time.perf_counter() - self.__startTime
+        if (self.__targetError != None
+            and populationError <= self.__targetError):
+            return "targetError"
+        if (self.__maxEvaluations != None
+            and self.__evaluationCount >= self.__maxEvaluations):
+            return "maxEvaluations"
+        if self.__timeLimit != None and elapsedTime >= self.__timeLimit:
+            return "timeLimit"
+        if (self.__stagnationCount != None
+            and self.__stagnantPopulationCount >= self.__stagnationCount):
+            return "stagnation"
+        if (self.__minimumDiversity != None
+            and self.__activeEngine.getDiversity(self.__currentPopulation)
+            < self.__minimumDiversity):
+            return "diversity"
+        if self.__callback != None:
+            generationInfo = {
+                "generation": len(self.__populationErrorList) - 1,
+                "population": self.__currentPopulation,
+                "fitnessList": self.__currentFitnessList,
+                "populationError": populationError,
+                "bestError": self.__bestError,
+                "evaluationCount": self.__evaluationCount,
+                "elapsedTime": elapsedTime}
+            if self.__callback(generationInfo):
+                return "callback"
+        return None
     def getOptimumVariableList(self):
         if not self.__solved:
             return 'not solved'
@@ -271,6 +502,30 @@ class GeneticAlgorithmSolver:
             return 'not solved'
         else:
             return self.__populationErrorList
+    def getStopReason(self):
+        # "targetError", "maxEvaluations", "timeLimit", "stagnation",
+        # "diversity", "callback", "populationCount" when all populations
+        # were made or "finish" when finish was called before
+        if not self.__solved:
+            return 'not solved'
+        return self.__stopReason
+    def getEvaluationCount(self):
+        # objective values calculated, without the ones found in the cache
+        if not self.__solved:
+            return 'not solved'
+        return self.__evaluationCount
+    def getGenerationCount(self):
+        if not self.__solved:
+            return 'not solved'
+        return len(self.__populationErrorList)
+    def getCacheStats(self):
+        # hits, misses, evictions, size and hitRate of the cache of the
+        # last solve
+        if not self.__solved:
+            return 'not solved'
+        if self.__cacheStats == None:
+            return 'no cache'
+        return self.__cacheStats
     def getFinalError(self):
         if not self.__solved:
             return 'not solved'
@@ -0,0 +1,240 @@
+import multiprocessing
+import random
+import traceback
+from geneticAlgorithmSolver import GeneticAlgorithmSolver
+from workerPool import getProcessContext
+
+class _IslandGroup:
+    # the islands of one worker, each a GeneticAlgorithmSolver run in steps
+    def __init__(self, function, variableCount, islandSeeds, solverOptions):
+        self.solvers = {}
+        for island, seed in islandSeeds:
+            solver = GeneticAlgorithmSolver(function = function,
+                                            variableCount = variableCount,
+                                            randomGenerator = random.Random(seed),
+                                            **solverOptions)
+            solver.start()
+            self.solvers[island] = solver
+        self.stopReasons = dict.fromkeys(self.solvers)
+    def evolve(self, generationCount, immigrantsByIsland, migrantCount):
+        # returns {island: (emigrants, stopReason)}
+        results = {}
+        for island, solver in self.solvers.items():
+            if self.stopReasons[island] == None:
+                solver.immigrate(immigrantsByIsland.get(island, []))
+                self.stopReasons[island] = solver.evolve(generationCount)
+            results[island] = (solver.getBestChromosomes(migrantCount),
+                               self.stopReasons[island])
+        return results
+    def finish(self):
+        results = {}
+        for island, solver in self.solvers.items():
+            solver.finish()
+            results[island] = {
+                "populationErrorList": solver.getPopulationErrorList(),
+                "optimumVariableList": solver.getOptimumVariableList(),
+                "optimumResult": solver.getOptimumResult(),
+                "finalError": solver.getFinalError(),
+                "evaluationCount": solver.getEvaluationCount(),
+                "stopReason": solver.getStopReason()}
+        return results
+
+def _runIslandGroup(connection, groupArguments):
+    # answers ("evolve", arguments) and ("finish", ()) commands with
+    # (True, result), or (False, error) when the command fails
+    try:
+        group = _IslandGroup(*groupArguments)
+        connection.send((True, None))
+        while True:
+            command, arguments = connection.recv()
+            if command == "evolve":
+                connection.send((True, group.evolve(*arguments)))
+            else:
+                connection.send((True, group.finish()))
+                break
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+    finally:
+        connection.close()
+
+class IslandModelSolver:
+    # Evolves islandCount populations of GeneticAlgorithmSolver, with the
+    # same solverOptions, in workerCount processes. Every
+    # migrationInterval populations each island sends its migrantCount
+    # fittest chromosomes to the islands it is connected to, which replace
+    # their least fit chromosomes with them. topology: "ring", island i
+    # sends to island i + 1, or "full", every island sends to all others.
+    # Each island has its own random.Random drawn from seed, so a seed
+    # gives the same results with any workerCount. The islands stop when
+    # one reaches the targetError of solverOptions or all have stopped.
+    topologies = ["ring", "full"]
+    def __init__(self, function, variableCount, islandCount = 4,
+                 migrationInterval = 10, migrantCount = 2, topology = "ring",
+                 workerCount = None, seed = None, **solverOptions):
+        if islandCount <= 0:
+            raise Exception("islandCount should be > 0")
+        if migrationInterval <= 0:
+            raise Exception("migrationInterval should be > 0")
+        if migrantCount < 0:
+            raise Exception("migrantCount should be >= 0")
+        if topology not in self.topologies:
+            raise Exception("topology should be \"ring\" or \"full\"")
+        if workerCount != None and workerCount <= 0:
+            raise Exception("workerCount should be > 0")
+        if "randomGenerator" in solverOptions:
+            raise Exception("the islands draw their random generators from seed")
+        if "checkpointFileName" in solverOptions:
+            raise Exception("the islands cannot share one checkpointFileName")
+        if workerCount == None:
+            workerCount = multiprocessing.cpu_count()
+        self.__function = function
+        self.__variableCount = int(variableCount)
+        self.__islandCount = int(islandCount)
+        self.__migrationInterval = int(migrationInterval)
+        self.__migrantCount = int(migrantCount)
+        self.__topology = topology
+        self.__workerCount = min(int(workerCount), self.__islandCount)
+        self.__seed = seed
+        self.__solverOptions = solverOptions
+        self.__solved = False
+        self.__islandResults = []
+        self.__populationErrorList = []
+        self.__bestIsland = None
+    def getSourceIslands(self, island):
+        # the islands sending their migrants to island
+        if self.__islandCount == 1:
+            return []
+        if self.__topology == "ring":
+            return [(island - 1) % self.__islandCount]
+        return [i for i in range(self.__islandCount) if i != island]
+    def solve(self):
+        seedGenerator = random.Random(self.__seed)
+        islandSeeds = [(i, seedGenerator.getrandbits(64))
+                       for i in range(self.__islandCount)]
+        groupArgumentsList = [
+            (self.__function, self.__variableCount,
+             islandSeeds[w::self.__workerCount], self.__solverOptions)
+            for w in range(self.__workerCount)]
+        if self.__workerCount == 1:
+            groups = [_IslandGroup(*groupArgumentsList[0])]
+            def runCommand(command, arguments):
+                results = {}
+                for group in groups:
+                    if command == "evolve":
+                        results.update(group.evolve(*arguments))
+                    else:
+                        results.update(group.finish())
+                return results
+            islandResults = self.__migrate(runCommand)
+        else:
+            context = getProcessContext()
+            connections = []
+            processes = []
+            def receive(connection):
+                isDone, result = connection.recv()
+                if not isDone:
+                    raise Exception("an island worker failed:\n" + result)
+                return result
+            def runCommand(command, arguments):
+                for connection in connections:
+                    connection.send((command, arguments))
+                results = {}
+                for connection in connections:
+                    results.update(receive(connection))
+                return results
+            try:
+                for groupArguments in groupArgumentsList:
+                    connection, workerConnection = context.Pipe()
+                    process = context.Process(target = _runIslandGroup,
+                                              args = (workerConnection,
+                                                      groupArguments))
+                    process.start()
+                    workerConnection.close()
+                    connections.append(connection)
+                    processes.append(process)
+                for connection in connections:
+                    receive(connection)
+                islandResults = self.__migrate(runCommand)
+            finally:
+                for process in processes:
+                    process.join(timeout = 1)
+                    if process.is_alive():
+                        process.terminate()
+                for connection in connections:
+                    connection.close()
+        self.__islandResults = [islandResults[i]
+                                for i in range(self.__islandCount)]
+        # the best population error of the islands in each generation
+        self.__populationErrorList = []
+        generationCount = max(len(r["populationErrorList"])
+                              for r in self.__islandResults)
+        for g in range(generationCount):
+            self.__populationErrorList.append(min(
+                r["populationErrorList"][g] for r in self.__islandResults
+                if g < len(r["populationErrorList"])))
+        finalErrors = [r["finalError"] for r in self.__islandResults]
+        self.__bestIsland = finalErrors.index(min(finalErrors))
+        self.__solved = True
+        return self.getFinalError()
+    def __migrate(self, runCommand):
+        # evolves the islands until they stop, exchanging migrants, and
+        # returns the results of their finish
+        immigrantsByIsland = {}
+        while True:
+            results = runCommand("evolve", (self.__migrationInterval,
+                                            immigrantsByIsland,
+                                            self.__migrantCount))
+            stopReasons = [results[i][1] for i in range(self.__islandCount)]
+            if ("targetError" in stopReasons
+                or all(r != None for r in stopReasons)):
+                break
+            immigrantsByIsland = {}
+            for island in range(self.__islandCount):
+                immigrants = []
+                for sourceIsland in self.getSourceIslands(island):
+                    immigrants.extend(results[sourceIsland][0])
+                immigrantsByIsland[island] = immigrants
+        return runCommand("finish", ())
+    def getOptimumVariableList(self):
+        if not self.__solved:
+            return 'not solved'
+        return self.__islandResults[self.__bestIsland]["optimumVariableList"]
+    def getOptimumResult(self):
+        if not self.__solved:
+            return 'not solved'
+        return self.__islandResults[self.__bestIsland]["optimumResult"]
+    def getFinalError(self):
+        if not self.__solved:
+            return 'not solved'
+        return self.__islandResults[self.__bestIsland]["finalError"]
+    def getPopulationErrorList(self):
+        # the lowest population error of the islands in each generation
+        if not self.__solved:
+            return 'not solved'
+        return self.__populationErrorList
+    def getIslandErrorLists(self):
+        if not self.__solved:
+            return 'not solved'
+        return [r["populationErrorList"] for r in self.__islandResults]
+    def getStopReasons(self):
+        if not self.__solved:
+            return 'not solved'
+        return [r["stopReason"] for r in self.__islandResults]
+    def getEvaluationCount(self):
+        if not self.__solved:
+            return 'not solved'
+        return sum(r["evaluationCount"] for r in self.__islandResults)
+    def printSolution(self):
+        if not self.__solved:
+            print('not solved')
+            return
+        printString='f('
+        optimumVariableList = self.getOptimumVariableList()
+        for v in range(0, self.__variableCount):
+            if v != 0:
+                printString += ','
+            printString += str(optimumVariableList[v])
+        printString += ')=' + str(self.getOptimumResult())
+        printString += ' Error=' + str(self.getFinalError())
+        print(printString)
+        return
@@ -5,6 +5,7 @@ from benchmarkFunctions import BentCigarFunction
 from benchmarkFunctions import RastriginsFunction
 from benchmarkFunctions import AckleysFunction
 from geneticAlgorithmSolver import GeneticAlgorithmSolver
+from experimentRunner import ExperimentRunner
 def main():
     variableCount = 30
     functionList = [SphereFunction,
@@ -102,80 +103,39 @@ def main():
     #---------------------------------------------------------------------
     iterationCount = 51
     populationCount = 300
+    # every run has its own seed, the runs are spread over the CPUs and
+    # stored in meanErrorRuns.csv, so an interrupted main resumes there
+    baseConfig = {"variableCount": variableCount,
+                  "populationCount": populationCount}
+    configNameList = ['Classic algorithm',
+                      'Enhanced algorithm 1 (compare after cross over)',
+                      'Enhanced algorithm 2 (compare candidate populations)',
+                      'Enhanced algorithm 3 (compare after mutation)',
+                      'Enhanced algorithm 4 (all together)']
+    configs = {configNameList[0]: dict(baseConfig),
+               configNameList[1]: dict(baseConfig,
+                                       compareAfterCrossOver = True),
+               configNameList[2]: dict(baseConfig,
+                                       compareCandidatePopulations = True),
+               configNameList[3]: dict(baseConfig,
+                                       compareAfterMutation = True),
+               configNameList[4]: dict(baseConfig,
+                                       compareAfterCrossOver = True,
+                                       compareCandidatePopulations = True,
+                                       compareAfterMutation = True)}
+    runner = ExperimentRunner(functionList, configs,
+                              range(1, iterationCount + 1),
+                              'meanErrorRuns.csv')
+    summary = ExperimentRunner.summarize(runner.run())
     for function in functionList:
-        #------------- Classic algorithm
-        sumError = 0.0
-        meanError = 0.0
-        random.seed(1)
-        for i in range(0, iterationCount):
-            solver = GeneticAlgorithmSolver(function = function,
-                                            variableCount = variableCount,
-                                            populationCount = populationCount
-                                            )
-            sumError += solver.solve()
-        meanError = float(sumError / iterationCount)
+        functionName = functionNameList[functionList.index(function)]
         print("-----------------------------------------")
-        print("Classic algorithm for "
-              + functionNameList[functionList.index(function)] + ":")
-        print(meanError)
-        #------------- Enhanced algorithm 1 (compare after cross over)
-        sumError = 0.0
-        meanError = 0.0
-        random.seed(1)
-        for i in range(0, iterationCount):
-            solver = GeneticAlgorithmSolver(function = function,
-                                            variableCount = variableCount,
-                                            populationCount = populationCount,
-                                            compareAfterCrossOver = True
-                                            )
-            sumError += solver.solve()
-        meanError = float(sumError / iterationCount)
-        print("Enhanced algorithm 1 (compare after cross over):")
-        print(meanError)
-        #------------- Enhanced algorithm 2 (compare candidate populations)
-        sumError = 0.0
-        meanError = 0.0
-        random.seed(1)
-        for i in range(0, iterationCount):
-            solver = GeneticAlgorithmSolver(function = function,
-                                            variableCount = variableCount,
-                                            populationCount = populationCount,
-                                            compareCandidatePopulations = True
-                                            )
-            sumError += solver.solve()
-        meanError = float(sumError / iterationCount)
-        print("Enhanced algorithm 2 (compare candidate populations):")
-        print(meanError)
-        #------------- Enhanced algorithm 3 (compare after mutation)
-        sumError = 0.0
-        meanError = 0.0
-        random.seed(1)
-        for i in range(0, iterationCount):
-            solver = GeneticAlgorithmSolver(function = function,
-                                            variableCount = variableCount,
-                                            populationCount = populationCount,
-                                            compareAfterMutation = True
-                                            )
-            sumError += solver.solve()
-        meanError = float(sumError / iterationCount)
-        print("Enhanced algorithm 3 (compare after mutation):")
-        print(meanError)
-        #------------- Enhanced algorithm 4 (all together)
-        sumError = 0.0
-        meanError = 0.0
-        random.seed(1)
-        for i in range(0, iterationCount):
-            solver = GeneticAlgorithmSolver(function = function,
-                                            variableCount = variableCount,
-                                            populationCount = populationCount,
-                                            compareAfterCrossOver = True,
-                                            compareCandidatePopulations = True,
-                                            compareAfterMutation = True
-                                            )
-            sumError += solver.solve()
-        meanError = float(sumError / iterationCount)
-        print("Enhanced algorithm 4 (all together)")
-        print(meanError)
+        for configName in configNameList:
+            if configName == configNameList[0]:
+                print(configName + " for " + functionName + ":")
+            else:
+                print(configName + ":")
+            print(summary[(function.__name__, configName)]["meanError"])
     #---------------------------------------------------------------------
 if __name__ == "__main__":
     main()
@@ -0,0 +1,396 @@
+import math
+import numpy as np
+class IPopulationEngine:
+    # Representation and variation operators of the chromosomes of a
+    # GeneticAlgorithmSolver. A population supports len() and indexing,
+    # calculateValue(chromosome) and calculateValues(population) are the
+    # objective values computed by the solver.
+    def __init__(self, function, variableCount, findMinimum,
+                 binaryVariableLength, chromosomeCount, crossOverProbability,
+                 geneMutationProbability, compareAfterCrossOver,
+                 compareAfterMutation, calculateValue, calculateValues,
+                 randomGenerator, selectionMethod):
+        self.function = function
+        self.variableCount = variableCount
+        self.findMinimum = findMinimum
+        self.binaryVariableLength = binaryVariableLength
+        self.chromosomeCount = chromosomeCount
+        self.crossOverProbability = crossOverProbability
+        self.geneMutationProbability = geneMutationProbability
+        self.compareAfterCrossOver = compareAfterCrossOver
+        self.compareAfterMutation = compareAfterMutation
+        self.calculateValue = calculateValue
+        self.calculateValues = calculateValues
+        # the random module or a random.Random
+        self.randomGenerator = randomGenerator
+        # an ISelectionMethod
+        self.selectionMethod = selectionMethod
+    def generateFirstPopulation(self):
+        pass
+    def convertChromosomeToVariableList(self, chromosome):
+        pass
+    def decodePopulation(self, population):
+        pass
+    def takeChromosomes(self, population, indices):
+        pass
+    def replaceChromosomes(self, population, indices, chromosomes):
+        # a copy of population with the chromosomes at indices replaced
+        pass
+    def getGenotypeKeys(self, population):
+        # hashable keys, equal only for equal chromosomes
+        pass
+    def getState(self):
+        # state of the engine's own random generators, for checkpoints
+        return None
+    def setState(self, state):
+        pass
+    def getDiversity(self, population):
+        # mean of 4 p (1 - p) over the genes, where p is the share of
+        # chromosomes with the gene set: 0 when all chromosomes are equal
+        pass
+    def calculateFitness(self, valueList):
+        pass
+    def selectBestChromosome(self, population, fitnessList):
+        pass
+    def makeCandidatePopulation(self, population, fitnessList):
+        # selection, cross over and mutation of a whole new population
+        pass
+class StringPopulationEngine(IPopulationEngine):
+    # chromosomes are strings of '0' and '1', binaryVariableLength
+    # characters per variable, and are changed one pair at a time
+    def generateFirstPopulation(self):
+        firstPopulation = []
+        for c in range(0, self.chromosomeCount):
+            newChromosome = ''
+            for v in range(0, self.variableCount):
+                newRandom = self.randomGenerator.randint(0,
+                                           2**self.binaryVariableLength - 1)
+                newBinaryVariable = format(newRandom, '0'
+                              + str(self.binaryVariableLength)
+                              + 'b')
+                newChromosome += newBinaryVariable
+            firstPopulation.append(newChromosome)
+        return firstPopulation
+    def convertChromosomeToVariableList(self, chromosome):
+        variableList = []
+        for v in range(0, self.variableCount):
+            binaryVariable = chromosome[v * self.binaryVariableLength :
+                                        (v + 1) * self.binaryVariableLength]
+            variable = (int(binaryVariable, 2) *
+                        (self.function.getMaxRangeOfVariables()
+                         - self.function.getMinRangeOfVariables())
+                        / (2**self.binaryVariableLength - 1)
+                        + self.function.getMinRangeOfVariables())
+            variableList.append(variable)
+        return variableList
+    def decodePopulation(self, population):
+        return [self.convertChromosomeToVariableList(c) for c in population]
+    def takeChromosomes(self, population, indices):
+        return [population[i] for i in indices]
+    def replaceChromosomes(self, population, indices, chromosomes):
+        newPopulation = list(population)
+        for i, chromosome in zip(indices, chromosomes):
+            newPopulation[i] = chromosome
+        return newPopulation
+    def getGenotypeKeys(self, population):
+        return list(population)
+    def getDiversity(self, population):
+        geneShares = (np.array([list(c) for c in population]) == '1').mean(axis = 0)
+        return float((4 * geneShares * (1 - geneShares)).mean())
+    def calculateFitness(self, valueList):
+        sumValue = sum(valueList)
+        fitnessList = []
+        if self.findMinimum:
+            maxValue = max(valueList)
+            for c in range(0, len(valueList)):
+                fitness = ((- valueList[c] + maxValue + 1)
+                           /(- sumValue + (maxValue + 1)
+                             * len(valueList)))
+                fitnessList.append(fitness)
+        else:
+            minValue = min(valueList)
+            for c in range(0, len(valueList)):
+                fitness = ((valueList[c] - minValue + 1)
+                           /(sumValue + (- minValue + 1)
+                             * len(valueList)))
+                fitnessList.append(fitness)
+        return fitnessList
+    def getUniforms(self, count):
+        return [self.randomGenerator.random() for r in range(0, count)]
+    def selectBestChromosome(self, population, fitnessList):
+        maxFitness = max(fitnessList)
+        indexOfMaxFitness = fitnessList.index(maxFitness)
+        return population[indexOfMaxFitness]
+    def crossOver(self, parentChromosome1, parentChromosome2):
+        newRandom = self.randomGenerator.uniform(0,1)
+        if self.crossOverProbability > newRandom:
+            onePoint = self.randomGenerator.randint(1,
+                                      (self.binaryVariableLength
+                                       * self.variableCount -1))
+            childChromosome1 = (parentChromosome1[:onePoint]
+                                + parentChromosome2[onePoint:])
+            childChromosome2 = (parentChromosome2[:onePoint]
+                                + parentChromosome1[onePoint:])
+        else:
+            childChromosome1 = parentChromosome1
+            childChromosome2 = parentChromosome2
+        return childChromosome1, childChromosome2
+    def crossOverAndCompare(self, parentChromosome1, parentChromosome2):
+        childChromosome1, childChromosome2 = (
+            self.crossOver(parentChromosome1, parentChromosome2)
+            )
+        if self.findMinimum:
+            if (self.calculateValue(parentChromosome1)
+                < self.calculateValue(childChromosome1)):
+                childChromosome1 = parentChromosome1
+            if (self.calculateValue(parentChromosome2)
+                < self.calculateValue(childChromosome2)):
+                childChromosome2 = parentChromosome2
+        else:
+            if (self.calculateValue(parentChromosome1)
+                > self.calculateValue(childChromosome1)):
+                childChromosome1 = parentChromosome1
+            if (self.calculateValue(parentChromosome2)
+                > self.calculateValue(childChromosome2)):
+                childChromosome2 = parentChromosome2
+        return childChromosome1, childChromosome2
+    def mutate(self, chromosome):
+        newChromosome = ''
+        for g in range(0, len(chromosome)):
+            newRandom = self.randomGenerator.uniform(0,1)
+            if self.geneMutationProbability > newRandom:
+                newChromosome += str(1 - int(chromosome[g]))
+            else:
+                newChromosome += chromosome[g]
+        return newChromosome
+    def mutateAndCompare(self, chromosome):
+        newChromosome = self.mutate(chromosome)
+        if self.findMinimum:
+            if (self.calculateValue(newChromosome)
+                < self.calculateValue(chromosome)):
+                return newChromosome
+            else:
+                return chromosome
+        else:
+            if (self.calculateValue(newChromosome)
+                > self.calculateValue(chromosome)):
+                return newChromosome
+            else:
+                return chromosome
+    def makeCandidatePopulation(self, population, fitnessList):
+        candidatePopulation = []
+        pairCount = int(self.chromosomeCount / 2)
+        parentIndices = self.selectionMethod.selectIndices(
+            fitnessList, 2 * pairCount, self.getUniforms)
+        for c in range(0, pairCount):
+            chromosome1 = population[parentIndices[2 * c]]
+            chromosome2 = population[parentIndices[2 * c + 1]]
+            if self.compareAfterCrossOver:
+                child1, child2 = self.crossOverAndCompare(chromosome1,
+                                                          chromosome2)
+            else:
+                child1, child2 = self.crossOver(chromosome1, chromosome2)
+            if self.compareAfterMutation:
+                mutated1 = self.mutateAndCompare(child1)
+                mutated2 = self.mutateAndCompare(child2)
+            else:
+                mutated1 = self.mutate(child1)
+                mutated2 = self.mutate(child2)
+            candidatePopulation.append(mutated1)
+            candidatePopulation.append(mutated2)
+        return candidatePopulation
+class MatrixPopulationEngine(IPopulationEngine):
+    # The population is a chromosomeCount x genes NumPy matrix and every
+    # operator handles the whole population at once. The NumPy generator
+    # is seeded from randomGenerator, so seeding it still makes runs
+    # repeatable.
+    def __init__(self, **kwargs):
+        IPopulationEngine.__init__(self, **kwargs)
+        self.numpyRandomGenerator = np.random.default_rng(
+            self.randomGenerator.getrandbits(64))
+    def getState(self):
+        return self.numpyRandomGenerator.bit_generator.state
+    def setState(self, state):
+        self.numpyRandomGenerator.bit_generator.state = state
+    def convertChromosomeToVariableList(self, chromosome):
+        return self.decodePopulation(chromosome[np.newaxis, :])[0].tolist()
+    def takeChromosomes(self, population, indices):
+        return np.asarray(population)[indices]
+    def replaceChromosomes(self, population, indices, chromosomes):
+        newPopulation = population.copy()
+        newPopulation[indices] = chromosomes
+        return newPopulation
+    @classmethod
+    def getRowBytes(cls, matrix):
+        matrix = np.ascontiguousarray(matrix)
+        return matrix.view(
+            np.dtype((np.void, matrix.shape[1] * matrix.itemsize))).ravel().tolist()
+    def calculateFitness(self, valueList):
+        values = np.asarray(valueList, dtype = np.float64)
+        if self.findMinimum:
+            maxValue = values.max()
+            return ((- values + maxValue + 1)
+                    / (- values.sum() + (maxValue + 1) * len(values)))
+        else:
+            minValue = values.min()
+            return ((values - minValue + 1)
+                    / (values.sum() + (- minValue + 1) * len(values)))
+    def selectBestChromosome(self, population, fitnessList):
+        return population[int(np.argmax(fitnessList))]
+    def keepBetter(self, oldPopulation, newPopulation):
+        # rows of newPopulation that are not better than the same rows of
+        # oldPopulation are replaced by them
+        oldValues = np.asarray(self.calculateValues(oldPopulation))
+        newValues = np.asarray(self.calculateValues(newPopulation))
+        if self.findMinimum:
+            isBetter = newValues < oldValues
+        else:
+            isBetter = newValues > oldValues
+        return np.where(isBetter[:, np.newaxis], newPopulation, oldPopulation)
+    def crossOver(self, parents1, parents2):
+        # the children of every pair, as if all pairs were crossed over
+        pass
+    def mutate(self, population):
+        pass
+    def makeCandidatePopulation(self, population, fitnessList):
+        pairCount = int(self.chromosomeCount / 2)
+        selected = self.selectionMethod.selectIndices(
+            fitnessList, 2 * pairCount, self.numpyRandomGenerator.random)
+        parents1 = population[selected[0::2]]
+        parents2 = population[selected[1::2]]
+        crossedChildren1, crossedChildren2 = self.crossOver(parents1, parents2)
+        isCrossed = (self.numpyRandomGenerator.random(pairCount)
+                     < self.crossOverProbability)[:, np.newaxis]
+        children1 = np.where(isCrossed, crossedChildren1, parents1)
+        children2 = np.where(isCrossed, crossedChildren2, parents2)
+        if self.compareAfterCrossOver:
+            # a child that is worse than its parent is replaced by it
+            children1 = self.keepBetter(parents1, children1)
+            children2 = self.keepBetter(parents2, children2)
+        children = np.empty((2 * pairCount, population.shape[1]),
+                            dtype = population.dtype)
+        children[0::2] = children1
+        children[1::2] = children2
+        mutatedChildren = self.mutate(children)
+        if self.compareAfterMutation:
+            return self.keepBetter(children, mutatedChildren)
+        return mutatedChildren
+class BitMatrixPopulationEngine(MatrixPopulationEngine):
+    # The population is a chromosomeCount x (variableCount *
+    # binaryVariableLength) uint8 matrix of 0/1 genes
+    def __init__(self, **kwargs):
+        MatrixPopulationEngine.__init__(self, **kwargs)
+        self.geneCount = self.variableCount * self.binaryVariableLength
+        self.bitWeights = 2.0 ** np.arange(self.binaryVariableLength - 1, -1, -1)
+    def generateFirstPopulation(self):
+        return self.numpyRandomGenerator.integers(
+            0, 2, (self.chromosomeCount, self.geneCount), dtype = np.uint8)
+    def decodePopulation(self, population):
+        population = np.asarray(population)
+        integers = (population.reshape(len(population), self.variableCount,
+                                       self.binaryVariableLength)
+                    @ self.bitWeights)
+        return (integers *
+                (self.function.getMaxRangeOfVariables()
+                 - self.function.getMinRangeOfVariables())
+                / (2**self.binaryVariableLength - 1)
+                + self.function.getMinRangeOfVariables())
+    def getGenotypeKeys(self, population):
+        # the packed bytes of each row
+        return self.getRowBytes(np.packbits(population, axis = -1))
+    def getDiversity(self, population):
+        geneShares = population.mean(axis = 0)
+        return float((4 * geneShares * (1 - geneShares)).mean())
+    def crossOver(self, parents1, parents2):
+        # one point cross over, the genes from the point on are swapped
+        onePoints = self.numpyRandomGenerator.integers(1, self.geneCount,
+                                                       len(parents1))
+        isSwapped = np.arange(self.geneCount) >= onePoints[:, np.newaxis]
+        return (np.where(isSwapped, parents2, parents1),
+                np.where(isSwapped, parents1, parents2))
+    def mutate(self, population):
+        mutationMask = (self.numpyRandomGenerator.random(population.shape)
+                        < self.geneMutationProbability)
+        return population ^ mutationMask
+class RealPopulationEngine(MatrixPopulationEngine):
+    # The population is a chromosomeCount x variableCount float64 matrix of
+    # the variables themselves, so nothing is decoded and
+    # binaryVariableLength is not used. Children are kept in the range of
+    # the variables.
+    # crossOverMethod: "sbx", simulated binary cross over with
+    # crossOverDistributionIndex, or "blend", BLX-blendAlpha,
+    # mutationMethod: "polynomial", with mutationDistributionIndex, or
+    # "gaussian", with a standard deviation of mutationScale times the
+    # range, applied to each gene with geneMutationProbability
+    crossOverMethods = ["sbx", "blend"]
+    mutationMethods = ["polynomial", "gaussian"]
+    def __init__(self, crossOverMethod = "sbx", mutationMethod = "polynomial",
+                 crossOverDistributionIndex = 15, mutationDistributionIndex = 20,
+                 blendAlpha = 0.5, mutationScale = 0.1, **kwargs):
+        if crossOverMethod not in self.crossOverMethods:
+            raise Exception("crossOverMethod should be \"sbx\" or \"blend\"")
+        if mutationMethod not in self.mutationMethods:
+            raise Exception("mutationMethod should be \"polynomial\" or \"gaussian\"")
+        if crossOverDistributionIndex < 0 or mutationDistributionIndex < 0:
+            raise Exception("the distribution indices should be >= 0")
+        if blendAlpha < 0:
+            raise Exception("blendAlpha should be >= 0")
+        if mutationScale <= 0:
+            raise Exception("mutationScale should be > 0")
+        MatrixPopulationEngine.__init__(self, **kwargs)
+        self.crossOverMethod = crossOverMethod
+        self.mutationMethod = mutationMethod
+        self.crossOverDistributionIndex = float(crossOverDistributionIndex)
+        self.mutationDistributionIndex = float(mutationDistributionIndex)
+        self.blendAlpha = float(blendAlpha)
+        self.mutationScale = float(mutationScale)
+        self.minValue = self.function.getMinRangeOfVariables()
+        self.maxValue = self.function.getMaxRangeOfVariables()
+    def generateFirstPopulation(self):
+        return self.numpyRandomGenerator.uniform(
+            self.minValue, self.maxValue,
+            (self.chromosomeCount, self.variableCount))
+    def decodePopulation(self, population):
+        return np.asarray(population, dtype = np.float64)
+    def getGenotypeKeys(self, population):
+        return self.getRowBytes(np.asarray(population, dtype = np.float64))
+    def getDiversity(self, population):
+        # standard deviation of each variable relative to the one of a
+        # uniform population, sqrt(12) / range
+        relativeDeviations = (population.std(axis = 0) * math.sqrt(12)
+                              / (self.maxValue - self.minValue))
+        return float(np.minimum(relativeDeviations, 1).mean())
+    def crossOver(self, parents1, parents2):
+        draws = self.numpyRandomGenerator.random(parents1.shape)
+        if self.crossOverMethod == "sbx":
+            exponent = 1 / (self.crossOverDistributionIndex + 1)
+            spreads = np.where(draws <= 0.5,
+                               (2 * draws) ** exponent,
+                               (1 / (2 * (1 - draws))) ** exponent)
+            children1 = 0.5 * ((1 + spreads) * parents1 + (1 - spreads) * parents2)
+            children2 = 0.5 * ((1 - spreads) * parents1 + (1 + spreads) * parents2)
+        else:
+            lowerParents = np.minimum(parents1, parents2)
+            distances = np.abs(parents1 - parents2)
+            lowerBounds = lowerParents - self.blendAlpha * distances
+            widths = (1 + 2 * self.blendAlpha) * distances
+            children1 = lowerBounds + draws * widths
+            children2 = (lowerBounds
+                         + self.numpyRandomGenerator.random(parents1.shape) * widths)
+        return (np.clip(children1, self.minValue, self.maxValue),
+                np.clip(children2, self.minValue, self.maxValue))
+    def mutate(self, population):
+        isMutated = (self.numpyRandomGenerator.random(population.shape)
+                     < self.geneMutationProbability)
+        valueRange = self.maxValue - self.minValue
+        if self.mutationMethod == "polynomial":
+            draws = self.numpyRandomGenerator.random(population.shape)
+            exponent = 1 / (self.mutationDistributionIndex + 1)
+            steps = np.where(draws < 0.5,
+                             (2 * draws) ** exponent - 1,
+                             1 - (2 * (1 - draws)) ** exponent) * valueRange
+        else:
+            steps = self.numpyRandomGenerator.normal(
+                0, self.mutationScale * valueRange, population.shape)
+        return np.clip(np.where(isMutated, population + steps, population),
+                       self.minValue, self.maxValue)
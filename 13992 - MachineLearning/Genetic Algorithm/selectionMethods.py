@@ -0,0 +1,41 @@
+import numpy as np
+class ISelectionMethod:
+    # Draws the indices of the parents of a generation at once, from the
+    # random numbers in [0, 1) returned by getUniforms(n) of the engine
+    def selectIndices(self, fitnessList, selectionCount, getUniforms):
+        pass
+class RouletteWheelSelection(ISelectionMethod):
+    # a chromosome is drawn with probability fitness / sum of fitness, by
+    # binary search of the draws in the cumulative fitness
+    def selectIndices(self, fitnessList, selectionCount, getUniforms):
+        boundries = np.cumsum(fitnessList, dtype = np.float64)
+        # the draws are scaled to the last boundry, so that rounding in
+        # the sum cannot leave a draw above all of them
+        draws = np.asarray(getUniforms(selectionCount)) * boundries[-1]
+        indices = np.searchsorted(boundries, draws, side = "right")
+        return np.minimum(indices, len(boundries) - 1)
+class StochasticUniversalSampling(ISelectionMethod):
+    # one draw places selectionCount evenly spaced pointers on the
+    # roulette wheel, the selected chromosomes are then shuffled
+    def selectIndices(self, fitnessList, selectionCount, getUniforms):
+        boundries = np.cumsum(fitnessList, dtype = np.float64)
+        draws = np.asarray(getUniforms(selectionCount + 1))
+        pointers = ((draws[0] + np.arange(selectionCount))
+                    * (boundries[-1] / selectionCount))
+        indices = np.minimum(np.searchsorted(boundries, pointers, side = "right"),
+                             len(boundries) - 1)
+        return indices[np.argsort(draws[1:], kind = "stable")]
+class TournamentSelection(ISelectionMethod):
+    # the fittest of tournamentSize chromosomes drawn with replacement
+    def __init__(self, tournamentSize = 2):
+        if tournamentSize <= 0:
+            raise Exception("tournamentSize should be > 0")
+        self.tournamentSize = int(tournamentSize)
+    def selectIndices(self, fitnessList, selectionCount, getUniforms):
+        fitnessArray = np.asarray(fitnessList, dtype = np.float64)
+        draws = np.asarray(getUniforms(selectionCount * self.tournamentSize))
+        contestants = np.minimum(
+            (draws * len(fitnessArray)).astype(np.int64),
+            len(fitnessArray) - 1).reshape(selectionCount, self.tournamentSize)
+        winners = np.argmax(fitnessArray[contestants], axis = 1)
+        return contestants[np.arange(selectionCount), winners]
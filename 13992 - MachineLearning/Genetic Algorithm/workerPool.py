@@ -0,0 +1,7 @@
+import multiprocessing
+
+def getProcessContext():
+    # fork where the platform has it, the default start method otherwise
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
@@ -0,0 +1,202 @@
+import argparse
+import json
+import math
+import platform
+import random
+import time
+import tracemalloc
+from dataSet import Instance
+from id5Classifier import Id5Classifier
+from trainingProfiler import TrainingProfiler
+from validator import Validator
+
+# Non-interactive benchmark of ID5 training, pruning, testing and k-fold
+# validation on synthetic data, for example:
+#   python benchmark.py --rows 500 1000 2000 --save-baseline baseline.json
+#   python benchmark.py --rows 500 1000 2000 --baseline baseline.json
+
+def generateDataSet(rowCount, featureCount, cardinality, noise, seed = None,
+                    ruleFeatureCount = 3, ruleSeed = 0):
+    # Instances with featureCount categorical features of cardinality
+    # values each. The label is "yes" when the summed random weights of the
+    # values of the first ruleFeatureCount features are positive, and is
+    # flipped with probability noise. The weights only depend on ruleSeed,
+    # so data sets with other seeds follow the same rule.
+    if rowCount <= 0 or featureCount <= 0 or cardinality <= 0:
+        raise Exception("rowCount, featureCount and cardinality should be > 0")
+    if noise < 0 or noise > 1:
+        raise Exception("noise should be between 0 and 1")
+    ruleRandomGenerator = random.Random(ruleSeed)
+    randomGenerator = random.Random(seed)
+    features = ["f" + str(f) for f in range(featureCount)]
+    values = ["v" + str(v) for v in range(cardinality)]
+    ruleFeatureCount = min(ruleFeatureCount, featureCount)
+    weights = [[ruleRandomGenerator.uniform(-1, 1) for v in range(cardinality)]
+               for f in range(ruleFeatureCount)]
+    dataSet = []
+    for r in range(rowCount):
+        valueIndices = [randomGenerator.randrange(cardinality)
+                        for f in range(featureCount)]
+        score = 0
+        for f in range(ruleFeatureCount):
+            score += weights[f][valueIndices[f]]
+        label = "yes" if score > 0 else "no"
+        if randomGenerator.random() < noise:
+            label = "no" if label == "yes" else "yes"
+        featureValues = {}
+        for f in range(featureCount):
+            featureValues[features[f]] = values[valueIndices[f]]
+        dataSet.append(Instance(featureValues, label))
+    return dataSet
+
+def measure(method, repeatCount, measureMemory):
+    # returns the result of the last call, the best time of repeatCount
+    # calls and the peak memory of one more call traced by tracemalloc
+    bestTime = None
+    for r in range(repeatCount):
+        startTime = time.perf_counter()
+        result = method()
+        elapsedTime = time.perf_counter() - startTime
+        if bestTime == None or elapsedTime < bestTime:
+            bestTime = elapsedTime
+    peakMemory = None
+    if measureMemory:
+        tracemalloc.start()
+        method()
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, bestTime, peakMemory
+
+def runBenchmarks(rowCounts, featureCount, cardinality, noise, seed,
+                  repeatCount = 3, foldCount = 5, workerCount = 1,
+                  measureMemory = True):
+    results = []
+    ruleSeed = seed if seed != None else random.randrange(2**32)
+    for rowCount in rowCounts:
+        dataSet = generateDataSet(rowCount, featureCount, cardinality, noise, seed,
+                                  ruleSeed = ruleSeed)
+        testDataSet = generateDataSet(rowCount, featureCount, cardinality, noise,
+                                      None if seed == None else seed + 1,
+                                      ruleSeed = ruleSeed)
+        def record(name, seconds, peakMemory, itemCount, subTree = None,
+                   accuracy = None):
+            result = {"benchmark": name,
+                      "rows": rowCount,
+                      "seconds": seconds,
+                      "rowsPerSecond": itemCount / seconds if seconds > 0 else None,
+                      "peakMemory": peakMemory,
+                      "accuracy": accuracy}
+            if subTree != None:
+                (result["nodeCount"], result["leafCount"],
+                 result["depth"]) = TrainingProfiler.getTreeSize(subTree.rootNode)
+            results.append(result)
+            print("%-14s %8d rows %9.3fs %12.0f rows/s %10s %8s"
+                  % (name, rowCount, seconds, result["rowsPerSecond"] or 0,
+                     "-" if peakMemory == None else "%.1fMB" % (peakMemory / 2**20),
+                     "" if subTree == None else str(result["nodeCount"]) + " nodes"))
+        subTree, seconds, peakMemory = measure(
+            lambda: Id5Classifier.train(dataSet), repeatCount, measureMemory)
+        record("train", seconds, peakMemory, rowCount, subTree)
+        accuracy, seconds, peakMemory = measure(
+            lambda: Id5Classifier.test(subTree, testDataSet), repeatCount, measureMemory)
+        record("test", seconds, peakMemory, rowCount, accuracy = accuracy)
+        prunedSubTree, seconds, peakMemory = measure(
+            lambda: Id5Classifier.trainAndPrune(dataSet), repeatCount, measureMemory)
+        record("trainAndPrune", seconds, peakMemory, rowCount, prunedSubTree,
+               Id5Classifier.test(prunedSubTree, testDataSet))
+        # each row is trained on foldCount - 1 times and tested on once
+        foldResults, seconds, peakMemory = measure(
+            lambda: Validator.kFoldValidateFolds(
+                foldCount, Id5Classifier.train, Id5Classifier.test, dataSet,
+                workerCount),
+            1, False)
+        record("kFoldValidate", seconds, peakMemory, rowCount * foldCount,
+               accuracy = sum(f[0] for f in foldResults) / foldCount)
+    return results
+
+def printScaling(results):
+    # growth of time and tree size between consecutive row counts, as the
+    # exponent k of rows^k
+    print("Scaling exponents between consecutive row counts:")
+    for name in ["train", "trainAndPrune"]:
+        runs = [r for r in results if r["benchmark"] == name]
+        for previous, current in zip(runs, runs[1:]):
+            rowRatio = math.log(current["rows"] / previous["rows"])
+            print("%-14s %8d -> %-8d time %5.2f  nodes %5.2f"
+                  % (name, previous["rows"], current["rows"],
+                     math.log(current["seconds"] / previous["seconds"]) / rowRatio,
+                     math.log(current["nodeCount"] / previous["nodeCount"]) / rowRatio))
+
+def compareWithBaseline(results, baseline, tolerance):
+    # prints the time ratio of every benchmark found in both runs, returns
+    # the number of benchmarks slower than the baseline by more than
+    # tolerance
+    baselineResults = {}
+    for result in baseline["results"]:
+        baselineResults[(result["benchmark"], result["rows"])] = result
+    regressionCount = 0
+    print("Compared with the baseline of " + baseline["date"] + ":")
+    for result in results:
+        baselineResult = baselineResults.get((result["benchmark"], result["rows"]))
+        if baselineResult == None:
+            continue
+        ratio = result["seconds"] / baselineResult["seconds"]
+        message = ""
+        if ratio > 1 + tolerance:
+            regressionCount += 1
+            message = "  [!slower]"
+        elif ratio < 1 - tolerance:
+            message = "  [faster]"
+        print("%-14s %8d rows %7.2fx time%s"
+              % (result["benchmark"], result["rows"], ratio, message))
+    return regressionCount
+
+def main():
+    parser = argparse.ArgumentParser(
+        description = "Benchmark ID5 training, pruning, testing and k-fold validation")
+    parser.add_argument("--rows", type = int, nargs = "+", default = [250, 500, 1000])
+    parser.add_argument("--features", type = int, default = 10)
+    parser.add_argument("--cardinality", type = int, default = 4)
+    parser.add_argument("--noise", type = float, default = 0.05)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--repeats", type = int, default = 3)
+    parser.add_argument("--folds", type = int, default = 5)
+    parser.add_argument("--workers", type = int, default = 1)
+    parser.add_argument("--no-memory", action = "store_true",
+                        help = "skip the tracemalloc run of each benchmark")
+    parser.add_argument("--save-baseline", metavar = "FILE")
+    parser.add_argument("--baseline", metavar = "FILE")
+    parser.add_argument("--tolerance", type = float, default = 0.1,
+                        help = "relative time change reported as a regression")
+    arguments = parser.parse_args()
+    config = {"rows": arguments.rows,
+              "features": arguments.features,
+              "cardinality": arguments.cardinality,
+              "noise": arguments.noise,
+              "seed": arguments.seed,
+              "repeats": arguments.repeats,
+              "folds": arguments.folds,
+              "workers": arguments.workers}
+    results = runBenchmarks(arguments.rows, arguments.features, arguments.cardinality,
+                            arguments.noise, arguments.seed, arguments.repeats,
+                            arguments.folds, arguments.workers,
+                            not arguments.no_memory)
+    if len(arguments.rows) > 1:
+        printScaling(results)
+    report = {"date": time.strftime("%Y-%m-%d %H:%M:%S"),
+              "python": platform.python_version(),
+              "machine": platform.machine(),
+              "config": config,
+              "results": results}
+    if arguments.save_baseline != None:
+        with open(arguments.save_baseline, "w") as outputFile:
+            json.dump(report, outputFile, indent = 2)
+    if arguments.baseline != None:
+        with open(arguments.baseline) as inputFile:
+            baseline = json.load(inputFile)
+        if baseline["config"] != config:
+            print("[!warning] the baseline was run with another configuration")
+        if compareWithBaseline(results, baseline, arguments.tolerance) > 0:
+            raise SystemExit(1)
+if __name__ == "__main__":
+    main()
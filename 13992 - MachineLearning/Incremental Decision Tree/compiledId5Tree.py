@@ -0,0 +1,295 @@
+import json
+import os
+import struct
+import numpy as np
+from dataSet import ColumnarDataSet
+
+class CompiledId5Tree:
+    # A trained ID5 tree flattened into arrays, for batch prediction.
+    # Node 0 is a "not found" leaf that every unknown branch points to,
+    # node 1 is the root. For a decision node n on feature f the child
+    # of the value coded c is childTable[childOffsets[n] + c], where the
+    # code len(featureValueLists[f]) is kept for unseen values.
+    # A node on a numeric feature has a threshold in nodeThresholds, NaN
+    # for the other nodes, and the values [True, False] for <= and >.
+    # Optionally the rows saved in the leaves are kept as well, the rows
+    # of node n are leafRows[leafRowOffsets[n] : leafRowOffsets[n+1]]
+    # in dataStore, and countCodes[countCodeOffsets[n] :
+    # countCodeOffsets[n+1]] are the value codes counted in node n, by
+    # training feature, in the order of its counts.
+    labelValueList = ["yes", "no", "unknown", "not found"]
+    # model file: magic, version, header length, json header, arrays
+    fileMagic = b"ID5M"
+    fileVersion = 2
+    def __init__(self, features, featureValueLists, nodeFeatures,
+                 nodeLabels, childOffsets, childTable, nodeThresholds = None,
+                 leafRowOffsets = None, leafRows = None, dataStore = None,
+                 trainingFeatures = None, trainingNumericFeatures = None,
+                 trainingOptions = None, countCodeOffsets = None,
+                 countCodes = None):
+        self.features = features
+        self.featureValueLists = featureValueLists
+        self.featureValueCodes = []
+        for valueList in featureValueLists:
+            valueCodes = {}
+            for code in range(len(valueList)):
+                valueCodes[valueList[code]] = code
+            self.featureValueCodes.append(valueCodes)
+        self.nodeFeatures = nodeFeatures
+        self.nodeLabels = nodeLabels
+        self.childOffsets = childOffsets
+        self.childTable = childTable
+        if nodeThresholds is None:
+            nodeThresholds = np.full(len(nodeFeatures), np.nan)
+        self.nodeThresholds = nodeThresholds
+        self.isNumericFeature = np.zeros(len(features), dtype = bool)
+        self.isNumericFeature[nodeFeatures[~np.isnan(nodeThresholds)]] = True
+        self.leafRowOffsets = leafRowOffsets
+        self.leafRows = leafRows
+        self.dataStore = dataStore
+        self.trainingFeatures = trainingFeatures
+        self.trainingNumericFeatures = trainingNumericFeatures
+        self.trainingOptions = trainingOptions
+        self.countCodeOffsets = countCodeOffsets
+        self.countCodes = countCodes
+    @classmethod
+    def compile(cls, subTree, includeRows = False, trainingFeatures = None,
+                trainingNumericFeatures = None, trainingOptions = None):
+        # trainingFeatures, trainingNumericFeatures: the features the tree
+        # may split on, trainingOptions: the restructuring options of the
+        # classifier, saved with the rows so that training can be resumed
+        features = []
+        featureIndices = {}
+        featureValueLists = []
+        featureValueCodes = []
+        # first pass: number the nodes and intern the branch values
+        treeNodes = [None, subTree.rootNode]
+        n = 1
+        while n < len(treeNodes):
+            treeNode = treeNodes[n]
+            if not treeNode.isLeaf:
+                if treeNode.decisionFeature not in featureIndices:
+                    featureIndices[treeNode.decisionFeature] = len(features)
+                    features.append(treeNode.decisionFeature)
+                    if treeNode.decisionThreshold == None:
+                        featureValueLists.append([])
+                        featureValueCodes.append({})
+                    else:
+                        featureValueLists.append([True, False])
+                        featureValueCodes.append({True: 0, False: 1})
+                f = featureIndices[treeNode.decisionFeature]
+                for b in treeNode.childBranches:
+                    if b.featureValue not in featureValueCodes[f]:
+                        featureValueCodes[f][b.featureValue] = len(featureValueLists[f])
+                        featureValueLists[f].append(b.featureValue)
+                    treeNodes.append(b.childNode)
+            n += 1
+        # second pass: fill the tables
+        nodeFeatures = np.full(len(treeNodes), -1, dtype = np.int32)
+        nodeLabels = np.full(len(treeNodes), 3, dtype = np.int8)
+        nodeThresholds = np.full(len(treeNodes), np.nan)
+        childOffsets = np.zeros(len(treeNodes), dtype = np.int64)
+        childTableLength = 0
+        for n in range(1, len(treeNodes)):
+            if not treeNodes[n].isLeaf:
+                f = featureIndices[treeNodes[n].decisionFeature]
+                childOffsets[n] = childTableLength
+                childTableLength += len(featureValueLists[f]) + 1
+        childTable = np.zeros(childTableLength, dtype = np.int32)
+        nextNode = 2
+        for n in range(1, len(treeNodes)):
+            treeNode = treeNodes[n]
+            if treeNode.isLeaf:
+                nodeLabels[n] = cls.labelValueList.index(treeNode.getLabel())
+            else:
+                f = featureIndices[treeNode.decisionFeature]
+                nodeFeatures[n] = f
+                if treeNode.decisionThreshold != None:
+                    nodeThresholds[n] = treeNode.decisionThreshold
+                for b in treeNode.childBranches:
+                    childTable[childOffsets[n]
+                               + featureValueCodes[f][b.featureValue]] = nextNode
+                    nextNode += 1
+        if not includeRows:
+            return cls(features, featureValueLists, nodeFeatures,
+                       nodeLabels, childOffsets, childTable, nodeThresholds)
+        if subTree.dataStore == None:
+            raise Exception("tree has no data store to save the rows from")
+        leafRowOffsets = np.zeros(len(treeNodes) + 1, dtype = np.int64)
+        leafRowLists = []
+        for n in range(1, len(treeNodes)):
+            leafRowOffsets[n + 1] = leafRowOffsets[n]
+            if treeNodes[n].isLeaf:
+                leafRowLists.append(np.array(treeNodes[n].leafSavedRows,
+                                             dtype = np.int64))
+                leafRowOffsets[n + 1] += len(treeNodes[n].leafSavedRows)
+        leafRows = np.concatenate(leafRowLists)
+        if trainingFeatures == None:
+            return cls(features, featureValueLists, nodeFeatures,
+                       nodeLabels, childOffsets, childTable, nodeThresholds,
+                       leafRowOffsets, leafRows, subTree.dataStore)
+        # the information gains of a node are summed in the order of its
+        # counts, which a reloaded tree keeps to train on the same way
+        countCodeOffsets = np.zeros(len(treeNodes) + 1, dtype = np.int64)
+        countCodeLists = []
+        for n in range(1, len(treeNodes)):
+            countCodes = []
+            for f in trainingFeatures:
+                countCodes.extend(treeNodes[n].featureValueCounts.get(f, {}))
+            countCodeLists.append(np.array(countCodes, dtype = np.int32))
+            countCodeOffsets[n + 1] = countCodeOffsets[n] + len(countCodes)
+        countCodes = np.concatenate(countCodeLists)
+        return cls(features, featureValueLists, nodeFeatures,
+                   nodeLabels, childOffsets, childTable, nodeThresholds,
+                   leafRowOffsets, leafRows, subTree.dataStore,
+                   trainingFeatures, trainingNumericFeatures, trainingOptions,
+                   countCodeOffsets, countCodes)
+    def save(self, fileName):
+        arrays = {"nodeFeatures": self.nodeFeatures,
+                  "nodeLabels": self.nodeLabels,
+                  "childOffsets": self.childOffsets,
+                  "childTable": self.childTable,
+                  "nodeThresholds": self.nodeThresholds}
+        header = {"features": self.features,
+                  "featureValueLists": self.featureValueLists,
+                  "arrays": {},
+                  "dataStore": None,
+                  "trainingFeatures": self.trainingFeatures,
+                  "trainingNumericFeatures": self.trainingNumericFeatures,
+                  "trainingOptions": self.trainingOptions}
+        if self.leafRows is not None:
+            arrays["leafRowOffsets"] = self.leafRowOffsets
+            arrays["leafRows"] = self.leafRows
+            if self.countCodes is not None:
+                arrays["countCodeOffsets"] = self.countCodeOffsets
+                arrays["countCodes"] = self.countCodes
+            arrays["storeCodes"] = self.dataStore.codes[:, :len(self.dataStore)]
+            arrays["storeLabelCodes"] = self.dataStore.getLabelColumn()
+            header["dataStore"] = {
+                "features": self.dataStore.features,
+                "featureValueLists": self.dataStore.featureValueLists,
+                "labelValueList": self.dataStore.labelValueList}
+        # arrays start at multiples of 8 bytes after the header
+        offset = 0
+        for name, values in arrays.items():
+            header["arrays"][name] = {"dtype": values.dtype.str,
+                                      "shape": list(values.shape),
+                                      "offset": offset}
+            offset += (values.nbytes + 7) // 8 * 8
+        headerBytes = json.dumps(header).encode("utf-8")
+        headerBytes += b" " * (-(len(headerBytes) + 16) % 8)
+        temporaryFileName = fileName + ".tmp"
+        with open(temporaryFileName, "wb") as outputFile:
+            outputFile.write(self.fileMagic)
+            outputFile.write(struct.pack("<IQ", self.fileVersion, len(headerBytes)))
+            outputFile.write(headerBytes)
+            for values in arrays.values():
+                valueBytes = np.ascontiguousarray(values).tobytes()
+                outputFile.write(valueBytes)
+                outputFile.write(b"\0" * (-len(valueBytes) % 8))
+        os.replace(temporaryFileName, fileName)
+    @classmethod
+    def load(cls, fileName, useMmap = True):
+        # The file is read at once, or memory mapped with useMmap, and the
+        # tables are views into it. No Python object is built per node.
+        if useMmap:
+            fileBytes = np.memmap(fileName, dtype = np.uint8, mode = "r")
+        else:
+            fileBytes = np.fromfile(fileName, dtype = np.uint8)
+        if fileBytes[:4].tobytes() != cls.fileMagic:
+            raise Exception("not an ID5 model file: " + fileName)
+        version, headerLength = struct.unpack("<IQ", fileBytes[4:16].tobytes())
+        # version 1 files have no thresholds
+        if version not in [1, cls.fileVersion]:
+            raise Exception("unsupported ID5 model file version: " + str(version))
+        header = json.loads(fileBytes[16 : 16 + headerLength].tobytes().decode("utf-8"))
+        arraysStart = 16 + headerLength
+        arrays = {}
+        for name, description in header["arrays"].items():
+            dtype = np.dtype(description["dtype"])
+            start = arraysStart + description["offset"]
+            count = int(np.prod(description["shape"]))
+            arrays[name] = (fileBytes[start : start + count * dtype.itemsize]
+                            .view(dtype).reshape(description["shape"]))
+        dataStore = None
+        if header["dataStore"] != None:
+            dataStore = ColumnarDataSet.fromArrays(
+                header["dataStore"]["features"],
+                header["dataStore"]["featureValueLists"],
+                header["dataStore"]["labelValueList"],
+                arrays["storeCodes"], arrays["storeLabelCodes"])
+        return cls(header["features"], header["featureValueLists"],
+                   arrays["nodeFeatures"], arrays["nodeLabels"],
+                   arrays["childOffsets"], arrays["childTable"],
+                   arrays.get("nodeThresholds"),
+                   arrays.get("leafRowOffsets"), arrays.get("leafRows"),
+                   dataStore, header["trainingFeatures"],
+                   header.get("trainingNumericFeatures"),
+                   header.get("trainingOptions"),
+                   arrays.get("countCodeOffsets"), arrays.get("countCodes"))
+    @classmethod
+    def toNumber(cls, value):
+        # NaN for a missing value, whose row ends in the "not found" node
+        if not ColumnarDataSet.isNumber(value):
+            return np.nan
+        return value
+    def encode(self, dataSet):
+        # (feature, row) matrix of the value codes of the compiled tree,
+        # dataSet is a ColumnarDataSet or a list of Instances. The values
+        # of numeric features are returned as they are, in a second matrix
+        # with NaN for the values that are not numbers.
+        valueCodes = np.zeros((len(self.features), len(dataSet)), dtype = np.int64)
+        numericValues = np.full((len(self.features), len(dataSet)), np.nan)
+        for f in range(len(self.features)):
+            feature = self.features[f]
+            featureValueCodes = self.featureValueCodes[f]
+            if self.isNumericFeature[f]:
+                if isinstance(dataSet, ColumnarDataSet):
+                    storeValueList = dataSet.featureValueLists[
+                        dataSet.featureIndices[feature]]
+                    translation = np.array(
+                        [self.toNumber(v) for v in storeValueList], dtype = np.float64)
+                    numericValues[f] = translation[dataSet.getColumn(feature)]
+                else:
+                    numericValues[f] = [
+                        self.toNumber(i.featureValues[feature]) for i in dataSet]
+                continue
+            unseenCode = len(self.featureValueLists[f])
+            if isinstance(dataSet, ColumnarDataSet):
+                storeValueList = dataSet.featureValueLists[
+                    dataSet.featureIndices[feature]]
+                translation = np.array(
+                    [featureValueCodes.get(v, unseenCode) for v in storeValueList],
+                    dtype = np.int64)
+                valueCodes[f] = translation[dataSet.getColumn(feature)]
+            else:
+                valueCodes[f] = [
+                    featureValueCodes.get(i.featureValues[feature], unseenCode)
+                    for i in dataSet]
+        return valueCodes, numericValues
+    def predictBatchCodes(self, dataSet):
+        valueCodes, numericValues = self.encode(dataSet)
+        nodes = np.ones(valueCodes.shape[1], dtype = np.int64)
+        activeRows = np.arange(valueCodes.shape[1])
+        # route all rows one level down per iteration
+        while len(activeRows) > 0:
+            activeFeatures = self.nodeFeatures[nodes[activeRows]]
+            isDecision = activeFeatures >= 0
+            activeRows = activeRows[isDecision]
+            activeFeatures = activeFeatures[isDecision]
+            activeNodes = nodes[activeRows]
+            activeCodes = valueCodes[activeFeatures, activeRows]
+            thresholds = self.nodeThresholds[activeNodes]
+            isNumeric = ~np.isnan(thresholds)
+            if isNumeric.any():
+                values = numericValues[activeFeatures[isNumeric], activeRows[isNumeric]]
+                activeCodes[isNumeric] = np.where(
+                    np.isnan(values), 2, values > thresholds[isNumeric])
+            nodes[activeRows] = self.childTable[
+                self.childOffsets[activeNodes] + activeCodes]
+        return self.nodeLabels[nodes]
+    def predictBatch(self, dataSet):
+        labelValues = np.array(self.labelValueList, dtype = object)
+        return labelValues[self.predictBatchCodes(dataSet)]
+    def getNodeCount(self):
+        return len(self.nodeFeatures) - 1
@@ -1,27 +1,263 @@
+import csv
+import json
+import math
+import os
+import re
 import xlrd
+import numpy as np
 
 class Instance:
-    def __init__(self, featureValues = [], label = None):
+    __slots__ = ("featureValues", "label")
+    def __init__(self, featureValues = None, label = None):
+        if featureValues == None:
+            featureValues = {}
         self.featureValues = featureValues
         self.label = label
 class DataSet:
+    cacheVersion = 2
     @classmethod
     def importXls(cls, fileName, sheetName):
-        workBook = xlrd.open_workbook(fileName)
-        inputSheet =  workBook.sheet_by_name(sheetName)
-        rowCount = inputSheet.nrows
-        colCount = inputSheet.ncols
-        features = []
-        for col in range(0, colCount-1):
-            features.append(inputSheet.cell(0, col).value)
-        instances = []
-        for row in range(1, rowCount):
-            values = []
-            for col in range(0, colCount-1):
-                values.append(inputSheet.cell(row, col).value)
-            label = inputSheet.cell(row, colCount-1).value
-            featureValues = {}
-            for i in range(len(features)):
-                featureValues[features[i]] = values[i]
-            instances.append(Instance(featureValues, label))
-        return instances
+        return cls.importColumnar(fileName, sheetName, useCache = False).toInstances()
+    @classmethod
+    def importCsv(cls, fileName):
+        return cls.importColumnar(fileName, useCache = False).toInstances()
+    @classmethod
+    def readColumns(cls, fileName, sheetName = None):
+        # returns features, feature columns and the label column (the last
+        # column) of a csv file or of a sheet of an xls workbook
+        if fileName.lower().endswith(".csv"):
+            with open(fileName, newline = "") as inputFile:
+                rows = list(csv.reader(inputFile))
+            header = rows[0]
+            columns = [[cls.parseCsvValue(r[col]) for r in rows[1:]]
+                       for col in range(len(header))]
+        else:
+            workBook = xlrd.open_workbook(fileName, on_demand = True)
+            inputSheet = workBook.sheet_by_name(sheetName)
+            header = inputSheet.row_values(0)
+            columns = [inputSheet.col_values(col, start_rowx = 1)
+                       for col in range(inputSheet.ncols)]
+            workBook.release_resources()
+        return header[:-1], columns[:-1], columns[-1]
+    # plain decimal numbers, float() also reads "nan", "inf" and "1_000"
+    decimalPattern = re.compile(r"\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*")
+    @classmethod
+    def parseCsvValue(cls, value):
+        # numbers are read as floats, the way xlrd reads numeric cells,
+        # other values, like "nan" for a missing value, stay strings
+        if cls.decimalPattern.fullmatch(value):
+            return float(value)
+        return value
+    @classmethod
+    def importColumnar(cls, fileName, sheetName = None, useCache = True):
+        # The parsed data set is cached in "<fileName>.<sheetName>.npz" and
+        # reused as long as the source file keeps its modification time.
+        cacheFileName = fileName + "." + str(sheetName) + ".npz"
+        cacheKey = {"version": cls.cacheVersion,
+                    "sheetName": sheetName,
+                    "mtime": os.stat(fileName).st_mtime_ns}
+        if useCache and os.path.exists(cacheFileName):
+            dataStore = ColumnarDataSet.load(cacheFileName, cacheKey)
+            if dataStore != None:
+                return dataStore
+        features, columns, labels = cls.readColumns(fileName, sheetName)
+        dataStore = ColumnarDataSet.fromColumns(features, columns, labels)
+        if useCache:
+            dataStore.save(cacheFileName, cacheKey)
+        return dataStore
+class ColumnarDataSet:
+    # Rows are stored column by column as small integer codes, every
+    # distinct value of a feature (and every label) is interned once.
+    # Label codes 0 and 1 are reserved for "yes" and "no".
+    def __init__(self, features, capacity = 64):
+        self.features = list(features)
+        self.featureIndices = {}
+        for f in range(len(self.features)):
+            self.featureIndices[self.features[f]] = f
+        self.featureValueLists = [[] for f in self.features]
+        self.featureValueCodes = [{} for f in self.features]
+        self.labelValueList = ["yes", "no"]
+        self.labelValueCodes = {"yes": 0, "no": 1}
+        self.codes = np.zeros((len(self.features), max(capacity, 1)),
+                              dtype = np.int32)
+        self.labelCodes = np.zeros(max(capacity, 1), dtype = np.int8)
+        self.rowCount = 0
+    @classmethod
+    def fromInstances(cls, instances, features = None):
+        instances = list(instances)
+        if features == None:
+            features = list(instances[0].featureValues.keys())
+        dataStore = cls(features, capacity = len(instances))
+        dataStore.extend(instances)
+        return dataStore
+    @classmethod
+    def fromColumns(cls, features, columns, labels):
+        dataStore = cls(features, capacity = len(labels))
+        for f in range(len(features)):
+            valueCodes = dataStore.featureValueCodes[f]
+            for v in columns[f]:
+                if v not in valueCodes:
+                    valueCodes[v] = len(valueCodes)
+                    dataStore.featureValueLists[f].append(v)
+            dataStore.codes[f, :len(labels)] = [valueCodes[v] for v in columns[f]]
+        dataStore.labelCodes[:len(labels)] = [dataStore.internLabel(l)
+                                              for l in labels]
+        dataStore.rowCount = len(labels)
+        return dataStore
+    def save(self, fileName, cacheKey = None):
+        # codes are saved as arrays, value lists and cacheKey as json
+        header = json.dumps({"cacheKey": cacheKey,
+                             "features": self.features,
+                             "featureValueLists": self.featureValueLists,
+                             "labelValueList": self.labelValueList})
+        temporaryFileName = fileName + ".tmp"
+        with open(temporaryFileName, "wb") as outputFile:
+            np.savez(outputFile,
+                     header = np.frombuffer(header.encode("utf-8"), dtype = np.uint8),
+                     codes = self.codes[:, :self.rowCount],
+                     labelCodes = self.labelCodes[:self.rowCount])
+        os.replace(temporaryFileName, fileName)
+    @classmethod
+    def load(cls, fileName, cacheKey = None):
+        # returns None if the file was saved with another cacheKey
+        with np.load(fileName) as inputFile:
+            header = json.loads(inputFile["header"].tobytes().decode("utf-8"))
+            if header["cacheKey"] != cacheKey:
+                return None
+            return cls.fromArrays(header["features"], header["featureValueLists"],
+                                  header["labelValueList"], inputFile["codes"],
+                                  inputFile["labelCodes"])
+    @classmethod
+    def fromArrays(cls, features, featureValueLists, labelValueList,
+                   codes, labelCodes):
+        dataStore = cls(features, capacity = 0)
+        dataStore.codes = np.array(codes, dtype = np.int32)
+        dataStore.labelCodes = np.array(labelCodes, dtype = np.int8)
+        dataStore.rowCount = len(dataStore.labelCodes)
+        dataStore.featureValueLists = [list(l) for l in featureValueLists]
+        dataStore.labelValueList = list(labelValueList)
+        for f in range(len(dataStore.features)):
+            for code in range(len(dataStore.featureValueLists[f])):
+                dataStore.featureValueCodes[f][dataStore.featureValueLists[f][code]] = code
+        for code in range(len(dataStore.labelValueList)):
+            dataStore.labelValueCodes[dataStore.labelValueList[code]] = code
+        return dataStore
+    def __len__(self):
+        return self.rowCount
+    def internValue(self, featureIndex, value):
+        valueCodes = self.featureValueCodes[featureIndex]
+        code = valueCodes.get(value)
+        if code == None:
+            code = len(self.featureValueLists[featureIndex])
+            valueCodes[value] = code
+            self.featureValueLists[featureIndex].append(value)
+        return code
+    def internLabel(self, label):
+        code = self.labelValueCodes.get(label)
+        if code == None:
+            code = len(self.labelValueList)
+            self.labelValueCodes[label] = code
+            self.labelValueList.append(label)
+        return code
+    def reserve(self, capacity):
+        if capacity <= self.codes.shape[1]:
+            return
+        capacity = max(capacity, 2 * self.codes.shape[1])
+        codes = np.zeros((len(self.features), capacity), dtype = np.int32)
+        codes[:, :self.rowCount] = self.codes[:, :self.rowCount]
+        labelCodes = np.zeros(capacity, dtype = np.int8)
+        labelCodes[:self.rowCount] = self.labelCodes[:self.rowCount]
+        self.codes = codes
+        self.labelCodes = labelCodes
+    def append(self, instance):
+        self.reserve(self.rowCount + 1)
+        row = self.rowCount
+        for f in range(len(self.features)):
+            self.codes[f, row] = self.internValue(
+                f, instance.featureValues[self.features[f]])
+        self.labelCodes[row] = self.internLabel(instance.label)
+        self.rowCount += 1
+        return row
+    def extend(self, instances):
+        firstRow = self.rowCount
+        for i in instances:
+            self.append(i)
+        return range(firstRow, self.rowCount)
+    def getColumn(self, feature):
+        return self.codes[self.featureIndices[feature], :self.rowCount]
+    @classmethod
+    def isNumber(cls, value):
+        # NaN, bools and strings like "" or "nan" are missing values of a
+        # numeric feature
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return not math.isnan(value)
+    def getNumericColumn(self, feature):
+        # NaN for the values that are not numbers
+        valueList = self.featureValueLists[self.featureIndices[feature]]
+        numbers = [v if self.isNumber(v) else np.nan for v in valueList]
+        return np.array(numbers, dtype = np.float64)[self.getColumn(feature)]
+    def isNumericFeature(self, feature):
+        valueList = self.featureValueLists[self.featureIndices[feature]]
+        if len(valueList) == 0:
+            return False
+        for v in valueList:
+            if not self.isNumber(v):
+                return False
+        return True
+    def getLabelColumn(self):
+        return self.labelCodes[:self.rowCount]
+    def getRowCodes(self, row):
+        return self.codes[:, row].tolist()
+    def getValue(self, row, feature):
+        featureIndex = self.featureIndices[feature]
+        return self.featureValueLists[featureIndex][self.codes[featureIndex, row]]
+    def getLabelCode(self, row):
+        return int(self.labelCodes[row])
+    def getLabel(self, row):
+        return self.labelValueList[self.labelCodes[row]]
+    def getInstance(self, row):
+        featureValues = {}
+        for f in self.features:
+            featureValues[f] = self.getValue(row, f)
+        return Instance(featureValues, self.getLabel(row))
+    def toInstances(self):
+        return [self.getInstance(r) for r in range(self.rowCount)]
+    def getFeatureValueCounts(self, rows, features, groups = None, groupCount = 1):
+        # Counts the given rows for every group of rows at once with a
+        # single bincount. Returns one (labelCounts, featureValueCounts)
+        # pair per group, with labelCounts = [positive, negative] and
+        # featureValueCounts[feature][valueCode] = [positive, negative].
+        if groups is None:
+            groups = np.zeros(len(rows), dtype = np.int64)
+        featureIndices = [self.featureIndices[f] for f in features]
+        offsets = np.zeros(len(features) + 1, dtype = np.int64)
+        offsets[1:] = np.cumsum(
+            [len(self.featureValueLists[f]) for f in featureIndices])
+        valueCount = int(offsets[-1])
+        labels = self.labelCodes[rows]
+        isLabeled = labels < 2
+        rows = rows[isLabeled]
+        labels = labels[isLabeled]
+        groups = groups[isLabeled]
+        labelCounts = np.bincount(groups * 2 + labels, minlength = 2 * groupCount)
+        keys = ((groups * valueCount + self.codes[featureIndices][:, rows]
+                 + offsets[:-1, None]) * 2 + labels)
+        counts = np.bincount(keys.ravel(), minlength = 2 * valueCount * groupCount)
+        counts = counts.reshape(-1, 2)
+        nonZeroKeys = np.flatnonzero(counts[:, 0] + counts[:, 1])
+        groupOfKeys, valueKeys = np.divmod(nonZeroKeys, max(valueCount, 1))
+        featureOfKeys = np.searchsorted(offsets, valueKeys, side = "right") - 1
+        valueCodes = valueKeys - offsets[featureOfKeys]
+        groupCounts = []
+        for g in range(groupCount):
+            featureValueCounts = {}
+            for f in features:
+                featureValueCounts[f] = {}
+            groupCounts.append(
+                (labelCounts[2 * g : 2 * g + 2].tolist(), featureValueCounts))
+        for g, f, code, count in zip(groupOfKeys.tolist(), featureOfKeys.tolist(),
+                                     valueCodes.tolist(),
+                                     counts[nonZeroKeys].tolist()):
+            groupCounts[g][1][features[f]][code] = count
+        return groupCounts
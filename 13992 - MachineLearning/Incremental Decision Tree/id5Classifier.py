@@ -1,211 +1,527 @@
 from anytree import Node, RenderTree
-import copy
+from array import array
+import bisect
 import math
+import numpy as np
+from dataSet import Instance, ColumnarDataSet
+from compiledId5Tree import CompiledId5Tree
 
 class Id5Classifier:
+    def __init__(self, features = None, dataStore = None,
+                 restructureMode = "path", restructureInterval = 1,
+                 gainThreshold = None, numericFeatures = None, profiler = None):
+        # features: names of the features the tree may split on,
+        # dataStore: ColumnarDataSet holding the rows saved in the leaves,
+        # restructureMode: after each insert "eager" restructures the whole
+        # tree, "path" only the nodes on the path of the inserted row and
+        # "batched" the whole tree every restructureInterval inserts or
+        # as soon as a node on the path of the inserted row has a feature
+        # whose information gain beats the current one by gainThreshold,
+        # numericFeatures: names of the features split by a threshold
+        # instead of by value, or "auto" for all the features whose
+        # values are all numbers in the first rows trained on,
+        # profiler: TrainingProfiler to collect timings and counters in
+        if restructureMode not in ["eager", "path", "batched"]:
+            raise Exception("restructureMode should be eager, path or batched")
+        if restructureInterval <= 0:
+            raise Exception("restructureInterval should be > 0")
+        self.restructureMode = restructureMode
+        self.restructureInterval = int(restructureInterval)
+        self.gainThreshold = gainThreshold
+        self.pendingInsertCount = 0
+        if numericFeatures == None:
+            numericFeatures = set()
+        elif numericFeatures != "auto":
+            numericFeatures = set(numericFeatures)
+        self.numericFeatures = numericFeatures
+        self.profiler = profiler
+        self.features = features
+        self.dataStore = dataStore
+        if self.features == None and self.dataStore != None:
+            self.features = list(self.dataStore.features)
+        self.checkNumericFeatures()
+        self.id5Tree = SubTree(rootNode = TreeNode(leafSavedRows = array("q")),
+                               dataStore = self.dataStore)
+    def setDataStore(self, dataStore):
+        self.dataStore = dataStore
+        self.id5Tree.dataStore = dataStore
+        if self.features == None:
+            self.features = list(dataStore.features)
+            self.checkNumericFeatures()
+    def checkNumericFeatures(self):
+        # once the features are known
+        if self.numericFeatures == "auto" or self.features == None:
+            return
+        for f in sorted(self.numericFeatures, key = str):
+            if f not in self.features:
+                raise ValueError("numericFeatures has an unknown feature: "
+                                 + str(f))
+    def partialFit(self, instances):
+        if isinstance(instances, Instance):
+            instances = [instances]
+        if isinstance(instances, ColumnarDataSet):
+            if self.dataStore == None:
+                self.setDataStore(instances)
+            if instances is self.dataStore:
+                return self.partialFitRows(range(len(instances)))
+            instances = (instances.getInstance(r) for r in range(len(instances)))
+        for i in instances:
+            if self.dataStore == None:
+                self.setDataStore(ColumnarDataSet(list(i.featureValues.keys())))
+            self.partialFitRows([self.dataStore.append(i)])
+        return self
+    def partialFitRows(self, rows):
+        # rows: indices of rows already stored in self.dataStore
+        self.resolveNumericFeatures()
+        for r in rows:
+            self.checkNumericValues(r)
+            if self.profiler != None:
+                self.profiler.startPhase("insert")
+            self.insertRow(self.id5Tree.rootNode, r)
+            if self.profiler != None:
+                self.profiler.stopPhase("insert")
+                self.profiler.startPhase("restructure")
+            if self.restructureMode == "eager":
+                self.restructure()
+            elif self.restructureMode == "path":
+                self.updatePath(r)
+            else:
+                self.pendingInsertCount += 1
+                if (self.pendingInsertCount >= self.restructureInterval
+                    or (self.gainThreshold != None
+                        and self.getPathGainDifference(r) > self.gainThreshold)):
+                    self.restructure()
+            if self.profiler != None:
+                self.profiler.stopPhase("restructure")
+                self.profiler.countInsert(self.id5Tree)
+        return self
+    def checkNumericValues(self, row):
+        # a missing value of a numeric feature has no side of a threshold,
+        # the row is rejected before any count changes
+        for f in self.numericFeatures:
+            value = self.dataStore.getValue(row, f)
+            if not ColumnarDataSet.isNumber(value):
+                raise ValueError("numeric feature " + str(f) + " of row "
+                                 + str(row) + " has no number: " + repr(value))
+    def resolveNumericFeatures(self):
+        if self.numericFeatures == "auto" and len(self.dataStore) > 0:
+            self.numericFeatures = set(
+                f for f in self.features if self.dataStore.isNumericFeature(f))
+    def restructure(self):
+        self.updateTree(self.id5Tree.rootNode)
+        if self.profiler != None:
+            self.profiler.startPhase("shrink")
+        self.shrinkTree(self.id5Tree.rootNode)
+        if self.profiler != None:
+            self.profiler.stopPhase("shrink")
+        self.pendingInsertCount = 0
+    def getPathNodes(self, row):
+        pathNodes = []
+        treeNode = self.id5Tree.rootNode
+        while not treeNode.isLeaf:
+            pathNodes.append(treeNode)
+            b = treeNode.getChildBranch(
+                self.dataStore.getValue(row, treeNode.decisionFeature))
+            if b == None:
+                break
+            treeNode = b.childNode
+        return pathNodes
+    def updatePath(self, row):
+        # Only the nodes on the path of the inserted row have new counts.
+        # Those are restructured top-down, and below the first node with a
+        # pulled up feature the whole subtree is updated as in updateTree.
+        # Then the path is shrunk bottom-up as in shrinkTree.
+        pathNodes = self.getPathNodes(row)
+        shrunkNode = None
+        for p in range(len(pathNodes)):
+            if self.restructureNode(pathNodes[p]):
+                for b in pathNodes[p].childBranches:
+                    self.updateTree(b.childNode)
+                shrunkNode = pathNodes[p]
+                pathNodes = pathNodes[:p]
+                break
+        if self.profiler != None:
+            self.profiler.startPhase("shrink")
+        if shrunkNode != None:
+            self.shrinkTree(shrunkNode)
+        for treeNode in reversed(pathNodes):
+            self.shrinkNode(treeNode)
+        if self.profiler != None:
+            self.profiler.stopPhase("shrink")
+    def getPathGainDifference(self, row):
+        maxGainDifference = 0
+        for treeNode in self.getPathNodes(row):
+            selectedFeature, selectedThreshold, gainDifference = (
+                self.getPullUpCandidate(treeNode))
+            maxGainDifference = max(maxGainDifference, gainDifference)
+        return maxGainDifference
+    def predict(self, instance):
+        return self.id5Tree.rootNode.predict(instance)
+    def compile(self):
+        return CompiledId5Tree.compile(self.id5Tree)
+    def save(self, fileName, includeRows = False):
+        # without the rows the model can only be loaded for prediction,
+        # with CompiledId5Tree.load
+        numericFeatures = self.numericFeatures
+        if numericFeatures != "auto":
+            numericFeatures = sorted(numericFeatures)
+        trainingOptions = {"restructureMode": self.restructureMode,
+                           "restructureInterval": self.restructureInterval,
+                           "gainThreshold": self.gainThreshold,
+                           "pendingInsertCount": self.pendingInsertCount}
+        CompiledId5Tree.compile(self.id5Tree, includeRows, self.features,
+                                numericFeatures, trainingOptions).save(fileName)
     @classmethod
-    def train(cls, dataSet):
-        def getEntropy(instances):
-            positiveCount = 0
-            negativeCount = 0
-            for i in instances:
-                if i.label == "yes":
-                    positiveCount += 1
-                elif i.label == "no":
-                    negativeCount += 1
-            if positiveCount == 0 or negativeCount == 0:
-                return 0
-            positiveProportion = positiveCount / (positiveCount + negativeCount)
-            negativeProportion = 1 - positiveProportion
-            return (
-                - positiveProportion * math.log2(positiveProportion)
-                - negativeProportion * math.log2(negativeProportion)
-                )
-        def getFeatureDistinctValues(feature, instances):
-            featureDistinctValues = []
-            for i in instances:
-                if i.featureValues[feature] not in featureDistinctValues:
-                    featureDistinctValues.append(i.featureValues[feature])
-            return featureDistinctValues
-        def getInformationGain(feature, instances):
-            featureDistinctValues = getFeatureDistinctValues(feature, instances)
-            totalCount = len(instances)
-            informationGain = getEntropy(instances)
-            for fv in featureDistinctValues:
-                subSetInstances = []
-                for i in instances:
-                    if i.featureValues[feature] == fv:
-                        subSetInstances.append(i)
-                subSetCount = len(subSetInstances)
-                informationGain -= subSetCount / totalCount * getEntropy(subSetInstances)
-            return informationGain
-        def insertInstance(treeNode, instance):
-            if treeNode == None:
-                print("[!error] Empty node")
-                return
-            if treeNode.isLeaf:
-                treeNode.leafSavedInstances.append(instance)
-                if getEntropy(treeNode.leafSavedInstances) == 0:
-                    return
-                else:
-                    potentialFeatures = treeNode.getPotentialFeatures(dataSet)
-                    maxInformationGain = 0
-                    selectedFeature = ""
-                    for f in potentialFeatures:
-                        informationGain = getInformationGain(f, treeNode.leafSavedInstances)
-                        if informationGain > maxInformationGain:
-                            maxInformationGain = informationGain
-                            selectedFeature = f
-                    if selectedFeature != "":
-                        treeNode.expandLeafNode(selectedFeature)
+    def load(cls, fileName, **kwargs):
+        # rebuilds a classifier that can be trained further from a model
+        # saved with includeRows, with its saved options unless kwargs
+        # override them
+        compiledTree = CompiledId5Tree.load(fileName, useMmap = False)
+        if compiledTree.leafRows is None:
+            raise Exception("model file has no saved rows: " + fileName)
+        options = dict(compiledTree.trainingOptions or {})
+        pendingInsertCount = options.pop("pendingInsertCount", 0)
+        options.update(kwargs)
+        classifier = cls(compiledTree.trainingFeatures, compiledTree.dataStore,
+                         numericFeatures = compiledTree.trainingNumericFeatures,
+                         **options)
+        classifier.pendingInsertCount = pendingInsertCount
+        classifier.resolveNumericFeatures()
+        nodeCount = len(compiledTree.nodeFeatures)
+        treeNodes = [None, classifier.id5Tree.rootNode]
+        leafNodes = []
+        n = 1
+        # nodes are numbered breadth first, so the children of a node are
+        # numbered in the order of its branches
+        while n < len(treeNodes):
+            treeNode = treeNodes[n]
+            f = int(compiledTree.nodeFeatures[n])
+            if f < 0:
+                leafNodes.append(n)
+                treeNode.leafSavedRows = array("q", compiledTree.leafRows[
+                    compiledTree.leafRowOffsets[n] : compiledTree.leafRowOffsets[n + 1]].tobytes())
             else:
-                foundWhereToInsert = False
-                for b in treeNode.childBranches:
-                    if instance.featureValues[treeNode.decisionFeature] == b.featureValue:
-                        foundWhereToInsert = True
-                        insertInstance(b.childNode, instance)
-                if not foundWhereToInsert:
-                    newBranch = TreeBranch(
-                        parentNode = treeNode,
-                        featureValue = instance.featureValues[treeNode.decisionFeature],
-                        childNode = None
-                        )
-                    treeNode.childBranches.append(newBranch)
-                    newLeafNode = TreeNode(
-                        parentBranch = newBranch,
-                        isLeaf = True,
-                        leafSavedInstances = [],
-                        decisionFeature = None,
-                        childBranches = None
-                        )
-                    newBranch.childNode = newLeafNode
-                    insertInstance(newLeafNode, instance)
-        def updateTree(treeNode):
-            def pullUp(feature, treeNode):
-                if treeNode.isLeaf:
-                    treeNode.expandLeafNode(feature)
-                elif treeNode.decisionFeature == feature:
-                    return
-                else:
-                    for b in treeNode.childBranches:
-                        pullUp(feature, b.childNode)
-                    swapWithChilds(treeNode)
-            def swapWithChilds(treeNode):
-                decisionFeature1 = treeNode.decisionFeature
-                featureValues1 = []
-                decisionFeature2 = treeNode.childBranches[0].childNode.decisionFeature
-                featureValues2 = []
-                childsOfChilds = {}
-                for b1 in treeNode.childBranches:
-                    if not b1.featureValue in featureValues1:
-                        featureValues1.append(b1.featureValue)
-                    for b2 in b1.childNode.childBranches:
-                        if not b2.featureValue in featureValues2:
-                            featureValues2.append(b2.featureValue)
-                        key = (b1.featureValue, b2.featureValue)
-                        childsOfChilds[key] = b2.childNode
-                for b1 in treeNode.childBranches:
-                    for b2 in b1.childNode.childBranches:
-                        del b2
-                    del b1.childNode
-                    del b1
-                treeNode.decisionFeature = decisionFeature2
-                treeNode.childBranches = []
-                for fv2 in featureValues2:
-                    newBranch2 = TreeBranch(
-                        parentNode = treeNode,
-                        featureValue = fv2,
-                        childNode = None
-                        )
-                    treeNode.childBranches.append(newBranch2)
-                    newDecisionNode1 = TreeNode(
-                        parentBranch = newBranch2,
-                        isLeaf = False,
-                        leafSavedInstances = [],
-                        decisionFeature = decisionFeature1,
-                        childBranches = []
-                        )
-                    newBranch2.childNode = newDecisionNode1
-                    for fv1 in featureValues1:
-                        if (fv1, fv2) in list(childsOfChilds.keys()):
-                            newBranch1 = TreeBranch(
-                                parentNode = newDecisionNode1,
-                                featureValue = fv1,
-                                childNode = childsOfChilds[(fv1, fv2)]
-                                )
-                            newDecisionNode1.childBranches.append(newBranch1)
-                            childsOfChilds[(fv1, fv2)].parentBranch = newBranch1
-            if treeNode.isLeaf:
-                return
+                treeNode.isLeaf = False
+                treeNode.decisionFeature = compiledTree.features[f]
+                if compiledTree.isNumericFeature[f]:
+                    treeNode.decisionThreshold = float(compiledTree.nodeThresholds[n])
+                treeNode.setChildBranches([])
+                valueList = compiledTree.featureValueLists[f]
+                childTable = compiledTree.childTable[
+                    compiledTree.childOffsets[n] : compiledTree.childOffsets[n] + len(valueList)]
+                childCodes = np.flatnonzero(childTable)
+                for code in childCodes[np.argsort(childTable[childCodes])]:
+                    newBranch = TreeBranch(parentNode = treeNode,
+                                           featureValue = valueList[code])
+                    newBranch.childNode = TreeNode(parentBranch = newBranch)
+                    treeNode.addChildBranch(newBranch)
+                    treeNodes.append(newBranch.childNode)
+            n += 1
+        if len(treeNodes) != nodeCount:
+            raise Exception("corrupt model file: " + fileName)
+        # leaf counts in one pass over the rows, decision nodes add up
+        # their children bottom up
+        rowCounts = np.diff(compiledTree.leafRowOffsets)[leafNodes]
+        groups = np.repeat(np.arange(len(leafNodes)), rowCounts)
+        rows = np.concatenate([compiledTree.leafRows[compiledTree.leafRowOffsets[n] :
+                                                     compiledTree.leafRowOffsets[n + 1]]
+                               for n in leafNodes])
+        leafCounts = classifier.dataStore.getFeatureValueCounts(
+            rows, classifier.features, groups, len(leafNodes))
+        for l in range(len(leafNodes)):
+            treeNode = treeNodes[leafNodes[l]]
+            treeNode.labelCounts, treeNode.featureValueCounts = leafCounts[l]
+            treeNode.indexNumericValues(classifier.dataStore, classifier.numericFeatures)
+        for n in range(len(treeNodes) - 1, 0, -1):
+            if not treeNodes[n].isLeaf:
+                for b in treeNodes[n].childBranches:
+                    treeNodes[n].mergeCounts(b.childNode)
+        # the counts in their saved order, the information gains are summed
+        # in it and ties between them are broken by its rounding
+        if compiledTree.countCodes is not None:
+            for n in range(1, len(treeNodes)):
+                countCodes = compiledTree.countCodes[
+                    compiledTree.countCodeOffsets[n] : compiledTree.countCodeOffsets[n + 1]].tolist()
+                c = 0
+                featureValueCounts = treeNodes[n].featureValueCounts
+                for f in classifier.features:
+                    valueCounts = featureValueCounts.get(f, {})
+                    if len(valueCounts) > 0:
+                        featureValueCounts[f] = {}
+                        for code in countCodes[c : c + len(valueCounts)]:
+                            featureValueCounts[f][code] = valueCounts[code]
+                        c += len(valueCounts)
+                if c != len(countCodes):
+                    raise Exception("corrupt model file: " + fileName)
+        return classifier
+    def insertRow(self, treeNode, row):
+        if treeNode == None:
+            print("[!error] Empty node")
+            return
+        treeNode.addRowCounts(self.dataStore, row, self.features,
+                              self.numericFeatures)
+        if treeNode.isLeaf:
+            treeNode.leafSavedRows.append(row)
+            treeNode.invalidateCache()
+            self.splitLeaf(treeNode)
+        else:
+            featureValue = self.dataStore.getValue(row, treeNode.decisionFeature)
+            b = treeNode.getChildBranch(featureValue)
+            if b != None:
+                self.insertRow(b.childNode, row)
             else:
-                savedInstances = treeNode.getSavedInstances()
-                currentInformationGain = getInformationGain(treeNode.decisionFeature, savedInstances)
-                potentialFeatures = treeNode.getPotentialFeatures(dataSet)
-                maxInformationGain = 0
-                selectedFeature = ""
-                for f in potentialFeatures:
-                    informationGain = getInformationGain(f, savedInstances)
-                    if informationGain > maxInformationGain:
-                        maxInformationGain = informationGain
-                        selectedFeature = f
-                if maxInformationGain > currentInformationGain:
-                    pullUp(selectedFeature, treeNode)
-                for b in treeNode.childBranches:
-                    updateTree(b.childNode)
-        def shrinkTree(treeNode):
+                newBranch = TreeBranch(
+                    parentNode = treeNode,
+                    featureValue = treeNode.getBranchKey(featureValue),
+                    childNode = None
+                    )
+                treeNode.addChildBranch(newBranch)
+                newLeafNode = TreeNode(
+                    parentBranch = newBranch,
+                    isLeaf = True,
+                    leafSavedRows = array("q"),
+                    decisionFeature = None,
+                    childBranches = None
+                    )
+                newBranch.childNode = newLeafNode
+                self.insertRow(newLeafNode, row)
+    def getBestSplit(self, treeNode, potentialFeatures):
+        # returns the feature with the highest information gain, its
+        # threshold if it is numeric and the gain
+        if self.profiler != None:
+            self.profiler.startPhase("informationGain")
+            self.profiler.count("informationGainEvaluations", len(potentialFeatures))
+        maxInformationGain = 0
+        selectedFeature = ""
+        selectedThreshold = None
+        for f in potentialFeatures:
+            informationGain, threshold = treeNode.getSplit(f)
+            if informationGain > maxInformationGain:
+                maxInformationGain = informationGain
+                selectedFeature = f
+                selectedThreshold = threshold
+        if self.profiler != None:
+            self.profiler.stopPhase("informationGain")
+        return selectedFeature, selectedThreshold, maxInformationGain
+    def splitLeaf(self, treeNode):
+        # expands an impure leaf on its best feature, returns whether it did
+        if treeNode.getEntropy() == 0:
+            return False
+        selectedFeature, selectedThreshold, maxInformationGain = self.getBestSplit(
+            treeNode, treeNode.getPotentialFeatures(self.features))
+        if selectedFeature == "":
+            return False
+        treeNode.expandLeafNode(selectedFeature, self.dataStore, self.features,
+                                self.numericFeatures, selectedThreshold)
+        if self.profiler != None:
+            self.profiler.count("expansions")
+        return True
+    def growLeaf(self, treeNode):
+        # splits a leaf and its new children until no split has any gain
+        if self.splitLeaf(treeNode):
+            for b in treeNode.childBranches:
+                self.growLeaf(b.childNode)
+    def getPullUpCandidate(self, treeNode):
+        # returns the best feature of a decision node, its threshold and
+        # how much its information gain exceeds the one of the current
+        # decision. For a numeric decision feature a better threshold of
+        # the same feature is a candidate too.
+        currentInformationGain = treeNode.getInformationGain(
+            treeNode.decisionFeature, treeNode.decisionThreshold)
+        if self.profiler != None:
+            self.profiler.count("informationGainEvaluations")
+        potentialFeatures = treeNode.getPotentialFeatures(self.features)
+        if treeNode.decisionThreshold != None:
+            potentialFeatures.append(treeNode.decisionFeature)
+        selectedFeature, selectedThreshold, maxInformationGain = self.getBestSplit(
+            treeNode, potentialFeatures)
+        return (selectedFeature, selectedThreshold,
+                maxInformationGain - currentInformationGain)
+    def updateTree(self, treeNode):
+        if treeNode.isLeaf:
+            return
+        self.restructureNode(treeNode)
+        for b in treeNode.childBranches:
+            self.updateTree(b.childNode)
+    def restructureNode(self, treeNode):
+        # pulls the best feature up to this decision node, returns whether
+        # the node changed
+        def pullUp(feature, threshold, treeNode):
             if treeNode.isLeaf:
-                return
+                treeNode.expandLeafNode(feature, self.dataStore, self.features,
+                                        self.numericFeatures, threshold)
+                if self.profiler != None:
+                    self.profiler.count("expansions")
+            elif treeNode.decisionFeature == feature:
+                # a numeric feature split at another threshold is split
+                # again and its subtree regrown from the saved rows
+                if treeNode.decisionThreshold != threshold:
+                    if self.profiler != None:
+                        self.profiler.count("rethresholds")
+                    treeNode.shrinkDecisionNode()
+                    treeNode.expandLeafNode(feature, self.dataStore, self.features,
+                                            self.numericFeatures, threshold)
+                    for b in treeNode.childBranches:
+                        self.growLeaf(b.childNode)
             else:
                 for b in treeNode.childBranches:
-                    shrinkTree(b.childNode)
-                savedInstances = treeNode.getSavedInstances()
-                if getEntropy(savedInstances) == 0:
-                    for b in treeNode.childBranches:
-                        if b.childNode.isLeaf:
-                            del b.childNode
-                            del b
-                    treeNode.isLeaf = True
-                    treeNode.leafSavedInstances = savedInstances
-                    treeNode.decisionFeature = None
-                    treeNode.childBranches = []
-        id5Tree = SubTree(rootNode = TreeNode())
-        for i in dataSet:
-            insertInstance(id5Tree.rootNode, i)
-            updateTree(id5Tree.rootNode)
-            shrinkTree(id5Tree.rootNode)
-        return id5Tree
+                    pullUp(feature, threshold, b.childNode)
+                swapWithChilds(treeNode)
+        def swapWithChilds(treeNode):
+            if self.profiler != None:
+                self.profiler.count("swaps")
+            decisionFeature1 = treeNode.decisionFeature
+            decisionThreshold1 = treeNode.decisionThreshold
+            featureValues1 = {}
+            decisionFeature2 = treeNode.childBranches[0].childNode.decisionFeature
+            decisionThreshold2 = treeNode.childBranches[0].childNode.decisionThreshold
+            featureValues2 = {}
+            childsOfChilds = {}
+            for b1 in treeNode.childBranches:
+                featureValues1.setdefault(b1.featureValue)
+                for b2 in b1.childNode.childBranches:
+                    featureValues2.setdefault(b2.featureValue)
+                    key = (b1.featureValue, b2.featureValue)
+                    childsOfChilds[key] = b2.childNode
+            for b1 in treeNode.childBranches:
+                for b2 in b1.childNode.childBranches:
+                    del b2
+                del b1.childNode
+                del b1
+            treeNode.decisionFeature = decisionFeature2
+            treeNode.decisionThreshold = decisionThreshold2
+            treeNode.setChildBranches([])
+            for fv2 in featureValues2:
+                newBranch2 = TreeBranch(
+                    parentNode = treeNode,
+                    featureValue = fv2,
+                    childNode = None
+                    )
+                treeNode.addChildBranch(newBranch2)
+                newDecisionNode1 = TreeNode(
+                    parentBranch = newBranch2,
+                    isLeaf = False,
+                    leafSavedRows = array("q"),
+                    decisionFeature = decisionFeature1,
+                    decisionThreshold = decisionThreshold1,
+                    childBranches = []
+                    )
+                newBranch2.childNode = newDecisionNode1
+                for fv1 in featureValues1:
+                    if (fv1, fv2) in childsOfChilds:
+                        newBranch1 = TreeBranch(
+                            parentNode = newDecisionNode1,
+                            featureValue = fv1,
+                            childNode = childsOfChilds[(fv1, fv2)]
+                            )
+                        newDecisionNode1.addChildBranch(newBranch1)
+                        newDecisionNode1.mergeCounts(childsOfChilds[(fv1, fv2)])
+                        childsOfChilds[(fv1, fv2)].parentBranch = newBranch1
+            treeNode.invalidateCache()
+        if treeNode.isLeaf:
+            return False
+        selectedFeature, selectedThreshold, gainDifference = (
+            self.getPullUpCandidate(treeNode))
+        if gainDifference > 0 and selectedFeature != "":
+            if self.profiler != None:
+                self.profiler.startPhase("pullUp")
+            pullUp(selectedFeature, selectedThreshold, treeNode)
+            if self.profiler != None:
+                self.profiler.stopPhase("pullUp")
+                self.profiler.count("pullUps")
+            return True
+        return False
+    def shrinkTree(self, treeNode):
+        if treeNode.isLeaf:
+            return
+        else:
+            for b in treeNode.childBranches:
+                self.shrinkTree(b.childNode)
+            self.shrinkNode(treeNode)
+    def shrinkNode(self, treeNode):
+        # turns a pure decision node, whose children are already shrunk,
+        # into a leaf
+        if not treeNode.isLeaf and treeNode.getEntropy() == 0:
+            if self.profiler != None:
+                self.profiler.count("shrinks")
+            savedRows = treeNode.getSavedRows()
+            for b in treeNode.childBranches:
+                if b.childNode.isLeaf:
+                    del b.childNode
+                    del b
+            treeNode.isLeaf = True
+            treeNode.leafSavedRows = savedRows
+            treeNode.decisionFeature = None
+            treeNode.decisionThreshold = None
+            treeNode.setChildBranches([])
+            treeNode.invalidateCache()
+    @classmethod
+    def train(cls, dataSet, **kwargs):
+        # kwargs: options of the classifier, like numericFeatures
+        return cls(**kwargs).partialFit(dataSet).id5Tree
     @classmethod
     def test(cls, subTree, dataSet):
+        predictedLabels = CompiledId5Tree.compile(subTree).predictBatch(dataSet)
         trueCount = 0
-        for i in dataSet:
-            if subTree.rootNode.predict(i) == i.label:
+        for p, i in zip(predictedLabels, dataSet):
+            if p == i.label:
                 trueCount +=1
-        accuracy = float(trueCount / len(dataSet))        
+        accuracy = float(trueCount / len(dataSet))
         return accuracy
     @classmethod
-    def trainAndPrune(cls, dataSet):
+    def trainAndPrune(cls, dataSet, **kwargs):
         validationCount = int(len(dataSet) * 0.25)
         validationDataSet = dataSet[:validationCount]
         trainDataSet = dataSet[validationCount:]
-        id5Tree = cls.train(trainDataSet)
-        trainAccuracy = cls.test(id5Tree, validationDataSet)
+        id5Tree = cls.train(trainDataSet, **kwargs)
+        profiler = kwargs.get("profiler")
+        if profiler != None:
+            profiler.startPhase("prune")
+        # pruning a node only changes the predictions of the validation
+        # instances that reach it, so candidates are scored in place
+        reachedInstances = {}
+        def routeInstance(treeNode, instance):
+            reachedInstances.setdefault(treeNode, []).append(instance)
+            if treeNode.isLeaf:
+                return
+            b = treeNode.getChildBranch(
+                instance.featureValues[treeNode.decisionFeature])
+            if b != None:
+                routeInstance(b.childNode, instance)
+        for i in validationDataSet:
+            routeInstance(id5Tree.rootNode, i)
         while True:
-            prunedTree = copy.deepcopy(id5Tree)
-            prunedTree.rootNode.pruneOnce()
-            prunedAccuracy = cls.test(prunedTree, validationDataSet)
-            if (prunedAccuracy < trainAccuracy
-                or len(prunedTree.rootNode.getAllLeafNodes())
-                == len(id5Tree.rootNode.getAllLeafNodes())):
+            selectedNode = id5Tree.rootNode.getPruneCandidate()
+            # shrinking a single branch node does not reduce the leaf count
+            if selectedNode == None or len(selectedNode.childBranches) == 1:
                 break
-            else:
-                id5Tree = prunedTree
-                trainAccuracy = prunedAccuracy
-        return id5Tree            
-        
+            instances = reachedInstances.get(selectedNode, [])
+            trueCount = 0
+            for i in instances:
+                if selectedNode.predict(i) == i.label:
+                    trueCount += 1
+            undoRecord = selectedNode.shrinkDecisionNode()
+            prunedLabel = selectedNode.getLabel()
+            prunedTrueCount = 0
+            for i in instances:
+                if prunedLabel == i.label:
+                    prunedTrueCount += 1
+            if prunedTrueCount < trueCount:
+                selectedNode.restoreDecisionNode(undoRecord)
+                break
+            if profiler != None:
+                profiler.count("prunes")
+        if profiler != None:
+            profiler.stopPhase("prune")
+            profiler.takeSnapshot(id5Tree)
+        return id5Tree
+
 class SubTree:
-    def __init__(self, parentBranch = None, rootNode = None):
+    __slots__ = ("parentBranch", "rootNode", "dataStore")
+    def __init__(self, parentBranch = None, rootNode = None, dataStore = None):
         self.parentBranch = parentBranch
         self.rootNode = rootNode
+        self.dataStore = dataStore
     def print(self):
         if self == None or self.rootNode == None:
             visualTree = Node("Empty tree")
@@ -214,101 +530,298 @@ class SubTree:
         for pre, fill, node in RenderTree(visualTree):
             print("%s%s" % (pre, node.name))
 class TreeNode:
+    __slots__ = ("parentBranch", "isLeaf", "leafSavedRows", "decisionFeature",
+                 "decisionThreshold", "childBranches", "childBranchMap",
+                 "labelCounts", "featureValueCounts", "sortedValues", "isDirty",
+                 "cachedLabel", "cachedSavedRowCount", "cachedLeafNodes")
     def __init__(self, parentBranch = None, isLeaf = True,
-                 leafSavedInstances = [], # for leaf nodes
-                 decisionFeature = None, childBranches = [] # for decision nodes
+                 leafSavedRows = None, # for leaf nodes
+                 decisionFeature = None, childBranches = None, # for decision nodes
+                 decisionThreshold = None # for decision nodes on numeric features
                  ):
+        if leafSavedRows == None:
+            leafSavedRows = array("q")
+        if childBranches == None and not isLeaf:
+            childBranches = []
         self.parentBranch = parentBranch
         self.isLeaf = isLeaf
-        self.leafSavedInstances = leafSavedInstances
+        self.leafSavedRows = leafSavedRows
         self.decisionFeature = decisionFeature
-        self.childBranches = childBranches
+        # the branches of a numeric decision feature are True for values
+        # <= decisionThreshold and False for greater values
+        self.decisionThreshold = decisionThreshold
+        self.setChildBranches(childBranches)
+        # sufficient statistics of all rows under this node:
+        # labelCounts = [positive, negative]
+        # featureValueCounts[feature][valueCode] = [positive, negative]
+        # sortedValues[feature] = [values, valueCodes] lists the distinct
+        # values of a numeric feature in increasing order
+        self.labelCounts = [0, 0]
+        self.featureValueCounts = {}
+        self.sortedValues = {}
+        # aggregates of the subtree, rebuilt on demand while isDirty
+        self.isDirty = True
+        self.cachedLabel = None
+        self.cachedSavedRowCount = 0
+        self.cachedLeafNodes = None
     def predict(self, instance):
         if self.isLeaf:
             return self.getLabel()
         else:
-            for b in self.childBranches:
-                if instance.featureValues[self.decisionFeature] == b.featureValue:
-                    return b.childNode.predict(instance)
+            b = self.getChildBranch(instance.featureValues[self.decisionFeature])
+            if b != None:
+                return b.childNode.predict(instance)
             return "not found"
-    def expandLeafNode(self, feature):
+    def setChildBranches(self, childBranches):
+        # childBranchMap indexes the same branches by their featureValue
+        self.childBranches = childBranches
+        self.childBranchMap = {}
+        if childBranches != None:
+            for b in childBranches:
+                self.childBranchMap[b.featureValue] = b
+    def addChildBranch(self, branch):
+        self.childBranches.append(branch)
+        self.childBranchMap[branch.featureValue] = branch
+    def getBranchKey(self, featureValue):
+        if self.decisionThreshold == None:
+            return featureValue
+        # a missing value has no branch, it is "not found" as in
+        # CompiledId5Tree
+        if not ColumnarDataSet.isNumber(featureValue):
+            return None
+        return featureValue <= self.decisionThreshold
+    def getChildBranch(self, featureValue):
+        return self.childBranchMap.get(self.getBranchKey(featureValue))
+    def expandLeafNode(self, feature, dataStore, features,
+                       numericFeatures = (), threshold = None):
         if not self.isLeaf:
             return self
-        leafSavedInstances = copy.deepcopy(self.leafSavedInstances)
-        featureDistinctValues = []
-        for i in leafSavedInstances:
-            if i.featureValues[feature] not in featureDistinctValues:
-                featureDistinctValues.append(i.featureValues[feature])
+        rows = np.array(self.leafSavedRows, dtype = np.int64)
         self.isLeaf = False
-        self.leafSavedInstances = []
+        self.leafSavedRows = array("q")
         self.decisionFeature = feature
-        self.childBranches = []
-        for fv in featureDistinctValues:
+        self.decisionThreshold = threshold
+        self.setChildBranches([])
+        if threshold == None:
+            valueCodes = dataStore.getColumn(feature)[rows]
+            featureValueList = dataStore.featureValueLists[
+                dataStore.featureIndices[feature]]
+        else:
+            valueCodes = (dataStore.getNumericColumn(feature)[rows]
+                          > threshold).astype(np.int64)
+            featureValueList = [True, False]
+        # children are numbered in order of first appearance of their value
+        distinctCodes, firstPositions, children = np.unique(
+            valueCodes, return_index = True, return_inverse = True)
+        childOrder = np.argsort(firstPositions)
+        childNumbers = np.empty_like(childOrder)
+        childNumbers[childOrder] = np.arange(len(childOrder))
+        children = childNumbers[children]
+        childCounts = dataStore.getFeatureValueCounts(
+            rows, features, children, len(distinctCodes))
+        for c in range(len(distinctCodes)):
             newBranch = TreeBranch(
                 parentNode = self,
-                featureValue = fv,
+                featureValue = featureValueList[distinctCodes[childOrder[c]]],
                 childNode = None
                 )
-            self.childBranches.append(newBranch)
+            self.addChildBranch(newBranch)
             newLeafNode = TreeNode(
                 parentBranch = newBranch,
                 isLeaf = True,
-                leafSavedInstances = [],
+                leafSavedRows = array("q", rows[children == c].tobytes()),
                 decisionFeature = None,
                 childBranches = None
                 )
+            newLeafNode.labelCounts, newLeafNode.featureValueCounts = childCounts[c]
+            newLeafNode.indexNumericValues(dataStore, numericFeatures)
             newBranch.childNode = newLeafNode
-            for i in leafSavedInstances:
-                if i.featureValues[feature] == fv:
-                    newLeafNode.leafSavedInstances.append(i)
+        self.invalidateCache()
     def shrinkDecisionNode(self):
+        # returns an undo record for restoreDecisionNode, the detached
+        # child branches are left untouched
         if self.isLeaf:
-            return self
-        savedInstances = self.getSavedInstances()
-        for b in self.childBranches:
-            b.childNode.shrinkDecisionNode()
-            del b.childNode
-            del b
+            return None
+        undoRecord = (self.decisionFeature, self.decisionThreshold,
+                      self.childBranches, self.childBranchMap)
+        # the rows of the subtree are collected while the node is still a
+        # decision node, as a leaf it would only return its own rows
+        self.leafSavedRows = self.getSavedRows()
         self.isLeaf = True
-        self.leafSavedInstances = savedInstances
         self.decisionFeature = None
-        self.childBranches = []
-    def getPositiveCount(self, decisionFeature = None, featureValue = None):
-        positiveCount = 0
+        self.decisionThreshold = None
+        self.setChildBranches([])
+        self.invalidateCache()
+        return undoRecord
+    def restoreDecisionNode(self, undoRecord):
+        self.isLeaf = False
+        self.leafSavedRows = array("q")
+        (self.decisionFeature, self.decisionThreshold,
+         self.childBranches, self.childBranchMap) = undoRecord
+        self.invalidateCache()
+    def invalidateCache(self):
+        # a dirty node always has dirty ancestors, so the walk up stops
+        # at the first ancestor that is already dirty
+        self.isDirty = True
+        treeNode = self
+        while treeNode.parentBranch != None:
+            treeNode = treeNode.parentBranch.parentNode
+            if treeNode.isDirty:
+                return
+            treeNode.isDirty = True
+    def refreshCache(self):
+        if not self.isDirty:
+            return
         if self.isLeaf:
-            for i in self.leafSavedInstances:
-                if decisionFeature == None or featureValue == None:
-                    if i.label == "yes":
-                        positiveCount += 1
-                elif i.featureValues[decisionFeature] == featureValue:
-                    if i.label == "yes":
-                        positiveCount += 1
+            self.cachedSavedRowCount = len(self.leafSavedRows)
+            self.cachedLeafNodes = [self]
         else:
+            self.cachedSavedRowCount = 0
+            self.cachedLeafNodes = []
             for b in self.childBranches:
-                if self.decisionFeature == decisionFeature and b.featureValue == featureValue:
-                    positiveCount += b.getPositiveCount()
-                else:
-                    positiveCount += b.getPositiveCount(decisionFeature, featureValue)
-        return positiveCount           
-    def getNegativeCount(self, decisionFeature = None, featureValue = None):
-        negativeCount = 0
-        if self.isLeaf:
-            for i in self.leafSavedInstances:
-                if decisionFeature == None or featureValue == None:
-                    if i.label == "no":
-                        negativeCount += 1
-                elif i.featureValues[decisionFeature] == featureValue:
-                    if i.label == "no":
-                        negativeCount += 1
+                b.childNode.refreshCache()
+                self.cachedSavedRowCount += b.childNode.cachedSavedRowCount
+                self.cachedLeafNodes.extend(b.childNode.cachedLeafNodes)
+        if self.labelCounts[0] > self.labelCounts[1]:
+            self.cachedLabel = "yes"
+        elif self.labelCounts[0] < self.labelCounts[1]:
+            self.cachedLabel = "no"
         else:
-            for b in self.childBranches:
-                if self.decisionFeature == decisionFeature and b.featureValue == featureValue:
-                    negativeCount += b.getNegativeCount()
+            self.cachedLabel = "unknown"
+        self.isDirty = False
+    def addRowCounts(self, dataStore, row, features, numericFeatures = ()):
+        labelCode = dataStore.getLabelCode(row)
+        if labelCode > 1:
+            return
+        self.labelCounts[labelCode] += 1
+        rowCodes = dataStore.getRowCodes(row)
+        for f in features:
+            valueCounts = self.featureValueCounts.setdefault(f, {})
+            featureIndex = dataStore.featureIndices[f]
+            code = rowCodes[featureIndex]
+            counts = valueCounts.get(code)
+            if counts == None:
+                counts = [0, 0]
+                valueCounts[code] = counts
+                if f in numericFeatures:
+                    self.insertSortedValue(
+                        f, dataStore.featureValueLists[featureIndex][code], code)
+            counts[labelCode] += 1
+    def insertSortedValue(self, feature, value, code):
+        values, valueCodes = self.sortedValues.setdefault(feature, [[], []])
+        i = bisect.bisect(values, value)
+        values.insert(i, value)
+        valueCodes.insert(i, code)
+    def indexNumericValues(self, dataStore, numericFeatures):
+        # sorts the values of the numeric features once, after the
+        # counts were set in bulk
+        for f in numericFeatures:
+            valueList = dataStore.featureValueLists[dataStore.featureIndices[f]]
+            valueCodes = sorted(self.featureValueCounts.get(f, {}),
+                                key = lambda code: valueList[code])
+            self.sortedValues[f] = [[valueList[code] for code in valueCodes],
+                                    valueCodes]
+    def mergeCounts(self, treeNode):
+        self.labelCounts[0] += treeNode.labelCounts[0]
+        self.labelCounts[1] += treeNode.labelCounts[1]
+        for feature, (otherValues, otherValueCodes) in treeNode.sortedValues.items():
+            valueCounts = self.featureValueCounts.get(feature, {})
+            self.sortedValues.setdefault(feature, [[], []])
+            for value, code in zip(otherValues, otherValueCodes):
+                if code not in valueCounts:
+                    self.insertSortedValue(feature, value, code)
+        for feature, otherValueCounts in treeNode.featureValueCounts.items():
+            valueCounts = self.featureValueCounts.setdefault(feature, {})
+            for value, otherCounts in otherValueCounts.items():
+                counts = valueCounts.get(value)
+                if counts == None:
+                    valueCounts[value] = list(otherCounts)
                 else:
-                    negativeCount += b.getNegativeCount(decisionFeature, featureValue)
-        return negativeCount
-    def getPotentialFeatures(self, dataSet):
-        potentialFeatures = list(dataSet[0].featureValues.keys())
+                    counts[0] += otherCounts[0]
+                    counts[1] += otherCounts[1]
+    def getPositiveCount(self):
+        return self.labelCounts[0]
+    def getNegativeCount(self):
+        return self.labelCounts[1]
+    @classmethod
+    def getCountsEntropy(cls, positiveCount, negativeCount):
+        if positiveCount == 0 or negativeCount == 0:
+            return 0
+        positiveProportion = positiveCount / (positiveCount + negativeCount)
+        negativeProportion = 1 - positiveProportion
+        return (
+            - positiveProportion * math.log2(positiveProportion)
+            - negativeProportion * math.log2(negativeProportion)
+            )
+    @classmethod
+    def getCountsEntropies(cls, counts):
+        # getCountsEntropy of every [positive, negative] row of counts
+        totals = counts.sum(axis = 1, keepdims = True)
+        proportions = counts / np.maximum(totals, 1)
+        logProportions = np.log2(np.where(proportions > 0, proportions, 1))
+        return - (proportions * logProportions).sum(axis = 1)
+    def getEntropy(self):
+        return self.getCountsEntropy(self.labelCounts[0], self.labelCounts[1])
+    def getInformationGain(self, feature, threshold = None):
+        # for a numeric feature the gain of the split at threshold, or of
+        # the best split if threshold is None
+        if feature in self.sortedValues:
+            return self.getSplit(feature, threshold)[0]
+        totalCount = self.labelCounts[0] + self.labelCounts[1]
+        informationGain = self.getEntropy()
+        if totalCount == 0:
+            return informationGain
+        for counts in self.featureValueCounts.get(feature, {}).values():
+            subSetCount = counts[0] + counts[1]
+            informationGain -= (subSetCount / totalCount
+                                * self.getCountsEntropy(counts[0], counts[1]))
+        return informationGain
+    def getSplit(self, feature, threshold = None):
+        # returns (informationGain, threshold). Numeric features are split
+        # in two at the given threshold or else at the best midpoint of two
+        # consecutive sorted values, found with running sums of the counts
+        # of the values. Categorical features have no threshold.
+        if feature not in self.sortedValues:
+            return self.getInformationGain(feature), None
+        values, valueCodes = self.sortedValues[feature]
+        valueCounts = self.featureValueCounts[feature]
+        if threshold != None:
+            leftCount = bisect.bisect(values, threshold)
+            if leftCount == 0 or leftCount == len(values):
+                return 0, threshold
+            leftCounts = [0, 0]
+            for code in valueCodes[:leftCount]:
+                leftCounts[0] += valueCounts[code][0]
+                leftCounts[1] += valueCounts[code][1]
+            return self.getBinarySplitInformationGain(leftCounts), threshold
+        if len(values) < 2:
+            return 0, None
+        # all the splits are scored at once, the best one is scored again
+        # like a split at a given threshold so that both gains compare equal
+        leftCounts = np.array([valueCounts[code] for code in valueCodes[:-1]],
+                              dtype = np.int64).cumsum(axis = 0)
+        totalCount = self.labelCounts[0] + self.labelCounts[1]
+        leftTotals = leftCounts.sum(axis = 1)
+        rightCounts = np.array(self.labelCounts) - leftCounts
+        informationGains = (
+            - leftTotals * self.getCountsEntropies(leftCounts)
+            - (totalCount - leftTotals) * self.getCountsEntropies(rightCounts))
+        i = int(np.argmax(informationGains))
+        informationGain = self.getBinarySplitInformationGain(leftCounts[i].tolist())
+        if informationGain <= 0:
+            return 0, None
+        return informationGain, (values[i] + values[i + 1]) / 2
+    def getBinarySplitInformationGain(self, leftCounts):
+        totalCount = self.labelCounts[0] + self.labelCounts[1]
+        leftCount = leftCounts[0] + leftCounts[1]
+        return (self.getEntropy()
+                - leftCount / totalCount
+                * self.getCountsEntropy(leftCounts[0], leftCounts[1])
+                - (totalCount - leftCount) / totalCount
+                * self.getCountsEntropy(self.labelCounts[0] - leftCounts[0],
+                                        self.labelCounts[1] - leftCounts[1]))
+    def getPotentialFeatures(self, features):
+        potentialFeatures = list(features)
         treeNode = self
         while True:
             if not treeNode.isLeaf:
@@ -318,35 +831,29 @@ class TreeNode:
             treeNode = treeNode.parentBranch.parentNode
         return potentialFeatures
     def getLabel(self):
-        if self.getPositiveCount() > self.getNegativeCount():
-            return "yes"
-        elif self.getPositiveCount() < self.getNegativeCount():
-            return "no"
-        else:
-            return "unknown"
-    def getSavedInstances(self):
-        savedInstances = []
+        self.refreshCache()
+        return self.cachedLabel
+    def getSavedRowCount(self):
+        self.refreshCache()
+        return self.cachedSavedRowCount
+    def getSavedRows(self):
+        savedRows = array("q")
         if self.isLeaf:
-            savedInstances.extend(self.leafSavedInstances)
+            savedRows.extend(self.leafSavedRows)
         else:
             for b in self.childBranches:
-                savedInstances.extend(b.childNode.getSavedInstances())
-        return savedInstances
+                savedRows.extend(b.childNode.getSavedRows())
+        return savedRows
     def getAllLeafNodes(self):
-        allLeafNodes = []
-        if self.isLeaf:
-            allLeafNodes.append(self)
-        else:
-            for b in self.childBranches:
-                allLeafNodes.extend(b.childNode.getAllLeafNodes())
-        return allLeafNodes
-    def pruneOnce(self):
+        # the returned list is the node's cache and must not be modified
+        self.refreshCache()
+        return self.cachedLeafNodes
+    def getPruneCandidate(self):
         allLeafNodes = self.getAllLeafNodes()
-        parentOfLeafNodes = []
+        parentOfLeafNodes = {}
         for l in allLeafNodes:
-            if (l.parentBranch != None
-                and l.parentBranch.parentNode not in parentOfLeafNodes):
-                parentOfLeafNodes.append(l.parentBranch.parentNode)
+            if l.parentBranch != None:
+                parentOfLeafNodes.setdefault(l.parentBranch.parentNode)
         maxProportion = 0
         selectedNode = None
         for p in parentOfLeafNodes:
@@ -363,6 +870,9 @@ class TreeNode:
                 if proportion > maxProportion:
                     maxProportion = proportion
                     selectedNode = p
+        return selectedNode
+    def pruneOnce(self):
+        selectedNode = self.getPruneCandidate()
         if selectedNode != None:
             selectedNode.shrinkDecisionNode()
         return
@@ -382,19 +892,25 @@ class TreeNode:
                 visualBranch.parent = visualNode
             return visualNode
 class TreeBranch:
+    __slots__ = ("parentNode", "featureValue", "childNode")
     def __init__(self, parentNode = None, featureValue = None, childNode = None):
         self.parentNode = parentNode
         self.featureValue = featureValue
         self.childNode = childNode
-    def getPositiveCount(self, decisionFeature, featureValue):
-        return self.childNode.getPositiveCount(decisionFeature, featureValue)           
-    def getNegativeCount(self, decisionFeature, featureValue):
-        return self.childNode.getNegativeCount(decisionFeature, featureValue)          
+    def getPositiveCount(self):
+        return self.childNode.getPositiveCount()
+    def getNegativeCount(self):
+        return self.childNode.getNegativeCount()
     def getVisualNode(self):
         if self == None:
             return Node("Empty branch")
         else:
-            visualBranch = Node(str(self.featureValue))
+            if self.parentNode.decisionThreshold == None:
+                visualBranch = Node(str(self.featureValue))
+            elif self.featureValue:
+                visualBranch = Node("<= " + str(self.parentNode.decisionThreshold))
+            else:
+                visualBranch = Node("> " + str(self.parentNode.decisionThreshold))
             visualNode = self.childNode.getVisualNode()
             visualNode.parent = visualBranch
             return visualBranch
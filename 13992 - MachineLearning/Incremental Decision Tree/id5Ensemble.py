@@ -0,0 +1,137 @@
+import math
+import multiprocessing
+import numpy as np
+from dataSet import Instance, ColumnarDataSet
+from id5Classifier import Id5Classifier
+from workerPool import getWorkerContext, workerContext, createPool
+
+def _trainMember(memberPlan):
+    # data store and options of the running fit
+    dataStore, classifierOptions = getWorkerContext("member")
+    features, rows = memberPlan
+    numericFeatures = classifierOptions.get("numericFeatures")
+    if numericFeatures != None and numericFeatures != "auto":
+        # only the numeric features the member has
+        classifierOptions = dict(classifierOptions, numericFeatures =
+                                 [f for f in numericFeatures if f in features])
+    classifier = Id5Classifier(features = features, dataStore = dataStore,
+                               **classifierOptions)
+    classifier.partialFitRows(rows)
+    # the parent process reattaches its own copy of the data store
+    classifier.dataStore = None
+    classifier.id5Tree.dataStore = None
+    return classifier
+
+class Id5Ensemble:
+    # Bagged ID5 trees on one shared columnar data store. Each member is
+    # trained on a bootstrap sample of the rows and, optionally, on a
+    # random subset of the features. New instances are sent to every
+    # member Poisson(1) times (online bagging). Predictions are the
+    # majority vote of the members, "unknown" on a tie.
+    def __init__(self, memberCount = 10, bootstrap = True, featureCount = None,
+                 seed = None, workerCount = 1, **classifierOptions):
+        # featureCount: number of features of each member, "sqrt" for the
+        # square root of the number of features or None for all of them,
+        # workerCount: processes training the members in fit,
+        # classifierOptions: options of each Id5Classifier
+        if memberCount <= 0:
+            raise Exception("memberCount should be > 0")
+        if workerCount <= 0:
+            raise Exception("workerCount should be > 0")
+        if featureCount != None and featureCount != "sqrt" and featureCount <= 0:
+            raise Exception("featureCount should be > 0, \"sqrt\" or None")
+        self.memberCount = memberCount
+        self.bootstrap = bootstrap
+        self.featureCount = featureCount
+        self.workerCount = workerCount
+        self.classifierOptions = classifierOptions
+        self.seedSequence = np.random.SeedSequence(seed)
+        self.randomGenerator = np.random.default_rng(self.seedSequence.spawn(1)[0])
+        self.dataStore = None
+        self.members = []
+        self.compiledMembers = None
+    def getMemberFeatures(self, randomGenerator):
+        features = self.dataStore.features
+        if self.featureCount == None:
+            return list(features)
+        if self.featureCount == "sqrt":
+            featureCount = max(1, int(round(math.sqrt(len(features)))))
+        else:
+            featureCount = min(self.featureCount, len(features))
+        selected = randomGenerator.choice(len(features), featureCount, replace = False)
+        return [features[f] for f in sorted(selected)]
+    def fit(self, dataSet):
+        # trains new members on dataSet, a ColumnarDataSet or a list of
+        # Instances
+        if isinstance(dataSet, ColumnarDataSet):
+            self.dataStore = dataSet
+        else:
+            self.dataStore = ColumnarDataSet.fromInstances(dataSet)
+        # the names of numericFeatures are checked against all the features,
+        # before the members get their subsets
+        Id5Classifier(dataStore = self.dataStore,
+                      numericFeatures = self.classifierOptions.get("numericFeatures"))
+        rowCount = len(self.dataStore)
+        memberPlans = []
+        for memberSeed in self.seedSequence.spawn(self.memberCount):
+            randomGenerator = np.random.default_rng(memberSeed)
+            features = self.getMemberFeatures(randomGenerator)
+            if self.bootstrap:
+                rows = randomGenerator.integers(0, rowCount, rowCount).tolist()
+            else:
+                rows = list(range(rowCount))
+            memberPlans.append((features, rows))
+        with workerContext("member", (self.dataStore, self.classifierOptions)):
+            # a pool worker, like a parallel k-fold fold, cannot have a pool
+            if (self.workerCount == 1
+                or multiprocessing.current_process().daemon):
+                self.members = [_trainMember(p) for p in memberPlans]
+            else:
+                with createPool(self.workerCount) as pool:
+                    self.members = pool.map(_trainMember, memberPlans, chunksize = 1)
+        for m in self.members:
+            m.setDataStore(self.dataStore)
+        self.compiledMembers = None
+        return self
+    def partialFit(self, instances):
+        if len(self.members) == 0:
+            raise Exception("the ensemble should be fit before partialFit")
+        if isinstance(instances, Instance):
+            instances = [instances]
+        for i in instances:
+            row = self.dataStore.append(i)
+            if self.bootstrap:
+                insertCounts = self.randomGenerator.poisson(1, len(self.members))
+            else:
+                insertCounts = np.ones(len(self.members), dtype = np.int64)
+            for m in range(len(self.members)):
+                if insertCounts[m] > 0:
+                    self.members[m].partialFitRows([row] * int(insertCounts[m]))
+        self.compiledMembers = None
+        return self
+    def predictBatchCodes(self, dataSet):
+        # label codes of CompiledId5Tree.labelValueList, 0 for "yes",
+        # 1 for "no" and 2 for "unknown"
+        if self.compiledMembers == None:
+            self.compiledMembers = [m.compile() for m in self.members]
+        memberCodes = np.array(
+            [c.predictBatchCodes(dataSet) for c in self.compiledMembers])
+        yesVotes = (memberCodes == 0).sum(axis = 0)
+        noVotes = (memberCodes == 1).sum(axis = 0)
+        return np.where(yesVotes > noVotes, 0, np.where(yesVotes < noVotes, 1, 2))
+    def predictBatch(self, dataSet):
+        labelValues = np.array(["yes", "no", "unknown"], dtype = object)
+        return labelValues[self.predictBatchCodes(dataSet)]
+    def predict(self, instance):
+        return self.predictBatch([instance])[0]
+    @classmethod
+    def train(cls, dataSet, **kwargs):
+        return cls(**kwargs).fit(dataSet)
+    @classmethod
+    def test(cls, ensemble, dataSet):
+        predictedLabels = ensemble.predictBatch(dataSet)
+        trueCount = 0
+        for p, i in zip(predictedLabels, dataSet):
+            if p == i.label:
+                trueCount += 1
+        return float(trueCount / len(dataSet))
@@ -1,6 +1,7 @@
 from id5Classifier import Id5Classifier
 from dataSet import Instance, DataSet
 from validator import Validator
+import os
 
 def main():
     #--------------------------------------------------------
@@ -12,7 +13,7 @@ def main():
         fileName = "data.xls"
     if sheetName == "":
         sheetName = "student-mat"
-    dataSet = DataSet.importXls(fileName, sheetName)
+    dataSet = DataSet.importColumnar(fileName, sheetName).toInstances()
     print("-------------------------------------------------")
     
     #--------------------------------------------------------
@@ -31,7 +32,8 @@ def main():
         foldCount = 5,
         trainMethod = Id5Classifier.train,
         testMethod = Id5Classifier.test,
-        dataSet = dataSet
+        dataSet = dataSet,
+        workerCount = min(5, os.cpu_count() or 1)
         )
     print("Average:")
     print(accuracy)
@@ -72,7 +74,8 @@ def main():
         foldCount = 5,
         trainMethod = Id5Classifier.trainAndPrune,
         testMethod = Id5Classifier.test,
-        dataSet = dataSet
+        dataSet = dataSet,
+        workerCount = min(5, os.cpu_count() or 1)
         )
     print("Average:")
     print(accuracy)
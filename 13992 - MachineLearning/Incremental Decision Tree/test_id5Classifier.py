@@ -0,0 +1,85 @@
+import random
+import unittest
+from dataSet import Instance
+from id5Classifier import Id5Classifier
+
+def generateNumericInstances(instanceCount, seed):
+    randomGenerator = random.Random(seed)
+    instances = []
+    for i in range(instanceCount):
+        x = round(randomGenerator.uniform(0, 10), 1)
+        c = randomGenerator.choice("abc")
+        label = "yes" if (x > 4) != (c == "a") else "no"
+        instances.append(Instance({"x": x, "c": c}, label))
+    return instances
+
+def generateInstances(instanceCount, seed):
+    randomGenerator = random.Random(seed)
+    instances = []
+    for i in range(instanceCount):
+        featureValues = {}
+        for f in range(4):
+            featureValues["f" + str(f)] = randomGenerator.choice("abc")
+        instances.append(Instance(featureValues,
+                                  randomGenerator.choice(["yes", "no"])))
+    return instances
+
+class ShrinkDecisionNodeTest(unittest.TestCase):
+    def testShrinkKeepsSavedRows(self):
+        classifier = Id5Classifier().partialFit(generateInstances(150, 1))
+        rootNode = classifier.id5Tree.rootNode
+        self.assertFalse(rootNode.isLeaf)
+        savedRowCount = rootNode.getSavedRowCount()
+        savedRows = sorted(rootNode.getSavedRows())
+        undoRecord = rootNode.shrinkDecisionNode()
+        self.assertEqual(len(rootNode.leafSavedRows), savedRowCount)
+        self.assertEqual(sorted(rootNode.leafSavedRows), savedRows)
+        rootNode.restoreDecisionNode(undoRecord)
+        self.assertEqual(rootNode.getSavedRowCount(), savedRowCount)
+    def testPruneKeepsSavedRows(self):
+        instances = generateInstances(200, 2)
+        id5Tree = Id5Classifier.trainAndPrune(instances)
+        self.assertEqual(id5Tree.rootNode.getSavedRowCount(), 150)
+
+class MissingNumericValueTest(unittest.TestCase):
+    def assertCountsMatchRows(self, classifier):
+        rootNode = classifier.id5Tree.rootNode
+        self.assertEqual(sum(rootNode.labelCounts), rootNode.getSavedRowCount())
+    def testTrainRejectsMissingValue(self):
+        for numericFeatures in [["x"], "auto"]:
+            classifier = Id5Classifier(numericFeatures = numericFeatures)
+            classifier.partialFit(generateNumericInstances(40, 3))
+            for missingValue in ["", "nan", float("nan"), None]:
+                instance = Instance({"x": missingValue, "c": "a"}, "yes")
+                with self.assertRaises(ValueError):
+                    classifier.partialFit([instance])
+                self.assertCountsMatchRows(classifier)
+                self.assertEqual(classifier.id5Tree.rootNode.getSavedRowCount(), 40)
+            classifier.partialFit(generateNumericInstances(10, 4))
+            self.assertCountsMatchRows(classifier)
+    def testPredictMissingValue(self):
+        classifier = Id5Classifier(numericFeatures = ["x"])
+        classifier.partialFit(generateNumericInstances(60, 5))
+        self.assertEqual(classifier.id5Tree.rootNode.decisionFeature, "x")
+        instances = [Instance({"x": v, "c": "b"}, "yes")
+                     for v in ["", "nan", float("nan"), None, 2.0, 8.0]]
+        scalarLabels = [classifier.predict(i) for i in instances]
+        compiledLabels = list(classifier.compile().predictBatch(instances))
+        self.assertEqual(scalarLabels, compiledLabels)
+        self.assertEqual(scalarLabels[:4], ["not found"] * 4)
+    def testPruneWithMissingValidationValue(self):
+        instances = generateNumericInstances(80, 6)
+        instances[0] = Instance({"x": "", "c": "a"}, "yes")
+        id5Tree = Id5Classifier.trainAndPrune(instances, numericFeatures = ["x"])
+        self.assertEqual(id5Tree.rootNode.getSavedRowCount(), 60)
+
+class NumericFeaturesTest(unittest.TestCase):
+    def testUnknownNumericFeature(self):
+        with self.assertRaisesRegex(ValueError, "age"):
+            Id5Classifier(features = ["x", "c"], numericFeatures = ["age"])
+        with self.assertRaisesRegex(ValueError, "age"):
+            Id5Classifier.train(generateNumericInstances(10, 7),
+                                numericFeatures = ["age"])
+
+if __name__ == "__main__":
+    unittest.main()
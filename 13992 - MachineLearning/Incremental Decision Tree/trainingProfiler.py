@@ -0,0 +1,92 @@
+import csv
+import json
+import time
+
+class TrainingProfiler:
+    # Collects timings and counters of an Id5Classifier, which only calls
+    # it when given one with Id5Classifier(profiler = TrainingProfiler()).
+    # Phase times include the time of the phases nested in them.
+    phases = ["insert", "restructure", "pullUp", "shrink",
+              "informationGain", "prune"]
+    counterNames = ["inserts", "expansions", "pullUps", "rethresholds",
+                    "swaps", "shrinks", "informationGainEvaluations", "prunes"]
+    def __init__(self, snapshotInterval = 100):
+        # snapshotInterval: inserts between two records of the tree size,
+        # 0 for none
+        if snapshotInterval < 0:
+            raise Exception("snapshotInterval should be >= 0")
+        self.snapshotInterval = int(snapshotInterval)
+        self.reset()
+    def reset(self):
+        self.startTime = time.perf_counter()
+        self.phaseTimes = dict.fromkeys(self.phases, 0.0)
+        self.phaseCounts = dict.fromkeys(self.phases, 0)
+        self.phaseStarts = {}
+        self.counters = dict.fromkeys(self.counterNames, 0)
+        self.snapshots = []
+    def startPhase(self, phase):
+        self.phaseStarts[phase] = time.perf_counter()
+    def stopPhase(self, phase):
+        self.phaseTimes[phase] += time.perf_counter() - self.phaseStarts.pop(phase)
+        self.phaseCounts[phase] += 1
+    def count(self, counterName, amount = 1):
+        self.counters[counterName] += amount
+    def countInsert(self, subTree):
+        self.counters["inserts"] += 1
+        if (self.snapshotInterval > 0
+            and self.counters["inserts"] % self.snapshotInterval == 0):
+            self.takeSnapshot(subTree)
+    def takeSnapshot(self, subTree):
+        nodeCount, leafCount, depth = self.getTreeSize(subTree.rootNode)
+        snapshot = {"elapsedTime": time.perf_counter() - self.startTime,
+                    "nodeCount": nodeCount,
+                    "leafCount": leafCount,
+                    "depth": depth}
+        snapshot.update(self.counters)
+        for phase in self.phases:
+            snapshot[phase + "Time"] = self.phaseTimes[phase]
+        self.snapshots.append(snapshot)
+    @classmethod
+    def getTreeSize(cls, treeNode):
+        # returns (nodeCount, leafCount, depth)
+        nodeCount = 0
+        leafCount = 0
+        depth = 0
+        treeNodes = [(treeNode, 0)]
+        while len(treeNodes) > 0:
+            treeNode, nodeDepth = treeNodes.pop()
+            nodeCount += 1
+            depth = max(depth, nodeDepth)
+            if treeNode.isLeaf:
+                leafCount += 1
+            else:
+                for b in treeNode.childBranches:
+                    treeNodes.append((b.childNode, nodeDepth + 1))
+        return nodeCount, leafCount, depth
+    def getStats(self):
+        return {"elapsedTime": time.perf_counter() - self.startTime,
+                "phaseTimes": dict(self.phaseTimes),
+                "phaseCounts": dict(self.phaseCounts),
+                "counters": dict(self.counters),
+                "snapshots": list(self.snapshots)}
+    def saveJson(self, fileName):
+        with open(fileName, "w") as outputFile:
+            json.dump(self.getStats(), outputFile, indent = 2)
+    def saveCsv(self, fileName):
+        # one row per snapshot, the counters and phase times in a row are
+        # totals up to the snapshot
+        fieldNames = (["elapsedTime", "nodeCount", "leafCount", "depth"]
+                      + self.counterNames
+                      + [phase + "Time" for phase in self.phases])
+        with open(fileName, "w", newline = "") as outputFile:
+            writer = csv.DictWriter(outputFile, fieldnames = fieldNames)
+            writer.writeheader()
+            writer.writerows(self.snapshots)
+    def print(self):
+        stats = self.getStats()
+        print("elapsed time: %.3fs" % stats["elapsedTime"])
+        for phase in self.phases:
+            print("%-16s %10.3fs %10d calls"
+                  % (phase, stats["phaseTimes"][phase], stats["phaseCounts"][phase]))
+        for counterName in self.counterNames:
+            print("%-26s %10d" % (counterName, stats["counters"][counterName]))
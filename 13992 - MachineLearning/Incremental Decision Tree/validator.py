@@ -1,20 +1,57 @@
+import random
+import time
+from workerPool import getWorkerContext, workerContext, createPool
+
+def _runFold(f):
+    # dataset and methods of the running k-fold validation
+    trainMethod, testMethod, dataSet, order, foldLength = getWorkerContext("fold")
+    testIndices = order[f * foldLength : (f+1) * foldLength]
+    trainIndices = order[: f * foldLength] + order[(f+1) * foldLength :]
+    trainDataSet = [dataSet[i] for i in trainIndices]
+    testDataSet = [dataSet[i] for i in testIndices]
+    startTime = time.perf_counter()
+    model = trainMethod(trainDataSet)
+    trainTime = time.perf_counter() - startTime
+    startTime = time.perf_counter()
+    accuracy = testMethod(model, testDataSet)
+    testTime = time.perf_counter() - startTime
+    return accuracy, trainTime, testTime
+
 class Validator:
     @classmethod
-    def kFoldValidate(cls, foldCount, trainMethod, testMethod, dataSet):
+    def kFoldValidate(cls, foldCount, trainMethod, testMethod, dataSet,
+                      workerCount = 1, shuffle = False, seed = None):
         sumAccuracy = 0
-        foldLength = int(len(dataSet) / foldCount)
+        foldResults = cls.kFoldValidateFolds(foldCount, trainMethod, testMethod,
+                                             dataSet, workerCount, shuffle, seed)
         print("Accuracy of each fold:")
         for f in range(0, foldCount):
-            trainDataSet = dataSet[: f * foldLength] + dataSet[(f+1) * foldLength :]
-            testDataSet = dataSet[f * foldLength : (f+1) * foldLength]
-            accuracy = cls.validate(trainMethod, testMethod, trainDataSet, testDataSet)
+            accuracy = foldResults[f][0]
             print(f+1, ',', accuracy)
             sumAccuracy += accuracy
         return float(sumAccuracy / foldCount)
     @classmethod
+    def kFoldValidateFolds(cls, foldCount, trainMethod, testMethod, dataSet,
+                           workerCount = 1, shuffle = False, seed = None):
+        # returns (accuracy, trainTime, testTime) of each fold in fold order,
+        # folds are run on a pool of workerCount processes when > 1
+        if foldCount <= 0:
+            raise Exception("foldCount should be > 0")
+        if workerCount <= 0:
+            raise Exception("workerCount should be > 0")
+        foldLength = int(len(dataSet) / foldCount)
+        order = list(range(len(dataSet)))
+        if shuffle:
+            random.Random(seed).shuffle(order)
+        with workerContext("fold", (trainMethod, testMethod, dataSet,
+                                    order, foldLength)):
+            if workerCount == 1:
+                return [_runFold(f) for f in range(0, foldCount)]
+            with createPool(workerCount) as pool:
+                return pool.map(_runFold, range(0, foldCount), chunksize = 1)
+    @classmethod
     def validate(cls, trainMethod, testMethod, trainDataSet, testDataSet):
         accuracy = 0
         model = trainMethod(trainDataSet)
         accuracy = testMethod(model, testDataSet)
         return accuracy
-        
@@ -0,0 +1,33 @@
+import contextlib
+import multiprocessing
+
+# state of the running parallel calls by name, inherited by forked workers
+# (or sent once to each spawned worker) instead of being pickled for
+# every task
+_workerContexts = {}
+def _setWorkerContexts(workerContexts):
+    _workerContexts.clear()
+    _workerContexts.update(workerContexts)
+def getWorkerContext(name):
+    return _workerContexts[name]
+@contextlib.contextmanager
+def workerContext(name, value):
+    # sets the context name while the block runs, calls nest
+    previousContexts = dict(_workerContexts)
+    _workerContexts[name] = value
+    try:
+        yield
+    finally:
+        _setWorkerContexts(previousContexts)
+def getProcessContext():
+    # fork where the platform has it, the default start method otherwise
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+def createPool(workerCount):
+    # a pool whose workers see the worker contexts set at this call
+    processContext = getProcessContext()
+    if processContext.get_start_method() == "fork":
+        return processContext.Pool(workerCount)
+    return processContext.Pool(workerCount, initializer = _setWorkerContexts,
+                               initargs = (dict(_workerContexts),))